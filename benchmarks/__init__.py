@@ -0,0 +1,6 @@
+"""
+Benchmarks of the overhead pytest-mpl adds to each figure test.
+
+The benchmarks follow the conventions of `asv <https://asv.readthedocs.io>`__,
+and can also be run without it, see ``benchmarks/README.rst``.
+"""
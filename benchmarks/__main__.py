@@ -0,0 +1,135 @@
+"""
+Run the benchmarks without asv.
+
+This is a minimal runner for the ``time_*`` and ``peakmem_*`` benchmarks,
+for quick measurements offline and in the current environment::
+
+    python -m benchmarks [-b REGEX] [--repeat N] [--json PATH]
+
+Times are the median time of a call. Unlike asv, which measures the peak
+resident memory of the process, ``peakmem_*`` benchmarks report the peak
+memory allocated by Python during the call, as traced by `tracemalloc`.
+"""
+
+import re
+import sys
+import json
+import time
+import inspect
+import pkgutil
+import argparse
+import importlib
+import itertools
+import statistics
+import tracemalloc
+from pathlib import Path
+
+# Target duration of each timing sample, used to choose how many calls to time
+SAMPLE_TIME = 0.01
+MAX_NUMBER = 1000
+
+
+def iter_benchmarks():
+    """
+    Yield the name, class and method name of each benchmark.
+    """
+    package = Path(__file__).parent
+    for module_info in sorted(pkgutil.iter_modules([str(package)]), key=lambda m: m.name):
+        if not module_info.name.startswith('bench_'):
+            continue
+        module = importlib.import_module(f'{__package__}.{module_info.name}')
+        for cls_name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            for method in sorted(vars(cls)):
+                if method.startswith(('time_', 'peakmem_')):
+                    yield f'{module_info.name}.{cls_name}.{method}', cls, method
+
+
+def iter_params(cls):
+    params = getattr(cls, 'params', [])
+    if not params:
+        return [()]
+    if not isinstance(params, tuple):
+        params = (params,)
+    return list(itertools.product(*params))
+
+
+def measure(cls, method, params, repeat):
+    """
+    Return the median time in seconds, or the peak memory in bytes, of a call.
+    """
+    samples = []
+    number = getattr(cls, 'number', None)
+    for _ in range(repeat):
+        benchmark = cls()
+        if hasattr(benchmark, 'setup'):
+            benchmark.setup(*params)
+        try:
+            function = getattr(benchmark, method)
+            if method.startswith('peakmem_'):
+                tracemalloc.start()
+                try:
+                    function(*params)
+                    samples.append(tracemalloc.get_traced_memory()[1])
+                finally:
+                    tracemalloc.stop()
+                continue
+            if number is None:  # Time one call to decide how many to time per sample
+                start = time.perf_counter()
+                function(*params)
+                elapsed = time.perf_counter() - start
+                number = max(1, min(MAX_NUMBER, int(SAMPLE_TIME / max(elapsed, 1e-9))))
+            start = time.perf_counter()
+            for _ in range(number):
+                function(*params)
+            samples.append((time.perf_counter() - start) / number)
+        finally:
+            if hasattr(benchmark, 'teardown'):
+                benchmark.teardown(*params)
+    return statistics.median(samples)
+
+
+def format_result(method, value):
+    if method.startswith('peakmem_'):
+        return f'{value / 2 ** 20:.2f} MiB'
+    for unit, scale in [('s', 1), ('ms', 1e-3), ('us', 1e-6)]:
+        if value >= scale:
+            break
+    return f'{value / scale:.3g} {unit}'
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__.split('\n\n')[1],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-b', '--bench', default='',
+                        help='Only run the benchmarks whose names match this regular expression.')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of samples of each benchmark.')
+    parser.add_argument('--json', help='Also write the results to this JSON file.')
+    args = parser.parse_args(args)
+
+    pattern = re.compile(args.bench)
+    results = []
+    for name, cls, method in iter_benchmarks():
+        if not pattern.search(name):
+            continue
+        param_names = getattr(cls, 'param_names', [])
+        for params in iter_params(cls):
+            value = measure(cls, method, params, args.repeat)
+            label = ', '.join(f'{k}={v}' for k, v in zip(param_names, params))
+            print(f'{name}({label}): {format_result(method, value)}', flush=True)
+            results.append({
+                'name': name,
+                'params': dict(zip(param_names, params)),
+                'unit': 'bytes' if method.startswith('peakmem_') else 'seconds',
+                'value': value,
+            })
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0 if results else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
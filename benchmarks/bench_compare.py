@@ -0,0 +1,87 @@
+"""
+Benchmarks of comparing figures in each of the comparison modes.
+"""
+
+import tempfile
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+
+from pytest_mpl.plugin import generate_test_name
+
+from .common import make_figure, make_item, make_plugin, write_hash_library
+
+
+class CompareFigure:
+    """
+    Time comparing a figure to its baseline image, its baseline hash, or both.
+
+    In the ``diff`` case the baselines are of a different figure, so the
+    comparison fails, and in hybrid mode the image comparison is also done.
+    """
+    params = (['image', 'hash', 'hybrid'], ['match', 'diff'], ['small', 'large'])
+    param_names = ['mode', 'outcome', 'size']
+    number = 1  # Hashing closes the figure, so it needs to be created for each call
+
+    def setup(self, mode, outcome, size):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        test_dir = Path(self.tmp_dir.name)
+        baseline_dir = test_dir / 'baseline'
+        hash_library = test_dir / 'hashes.json'
+
+        # Generate the baselines from the figure, or from a different one
+        generator = make_plugin(test_dir, generate_dir=baseline_dir)
+        item = make_item(generator, test_dir)
+        baseline_path = generator.generate_baseline_image(item, make_figure(size, seed=0))
+        baseline_hash = generator.generate_image_hash(item, make_figure(size, seed=0))
+        if outcome == 'diff':
+            # Keep the same image shape, so the images are compared pixel by pixel
+            generator.save_figure(item, make_figure(size, seed=1), baseline_path)
+            baseline_hash = '0' * 64
+        write_hash_library(hash_library, {generate_test_name(item): baseline_hash})
+
+        kwargs = {}
+        if mode in ('image', 'hybrid'):
+            kwargs['baseline_dir'] = baseline_dir
+        if mode in ('hash', 'hybrid'):
+            kwargs['hash_library'] = hash_library
+        self.plugin = make_plugin(test_dir, **kwargs)
+        self.item = make_item(self.plugin, test_dir)
+        self.result_dir = self.plugin.make_test_results_dir(self.item)
+        self.fig = make_figure(size, seed=0)
+
+    def teardown(self, mode, outcome, size):
+        plt.close(self.fig)
+        self.tmp_dir.cleanup()
+
+    def time_compare(self, mode, outcome, size):
+        if mode == 'image':
+            self.plugin.compare_image_to_baseline(self.item, self.fig, self.result_dir,
+                                                  summary=self.plugin.new_summary(self.item))
+        else:
+            self.plugin.compare_image_to_hash_library(self.item, self.fig, self.result_dir,
+                                                      summary=self.plugin.new_summary(self.item))
+
+
+class LoadHashLibrary:
+    """
+    Time loading a hash library with a given number of hashes.
+    """
+    params = [100, 10_000, 100_000]
+    param_names = ['hashes']
+
+    def setup(self, n_hashes):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.plugin = make_plugin(self.tmp_dir.name)
+        self.path = Path(self.tmp_dir.name) / 'hashes.json'
+        write_hash_library(self.path, {f'test_module_{i // 100}.test_figure[{i}]': f'{i:064x}'
+                                       for i in range(n_hashes)})
+
+    def teardown(self, n_hashes):
+        self.tmp_dir.cleanup()
+
+    def time_load_hash_library(self, n_hashes):
+        self.plugin.load_hash_library(self.path)
+
+    def peakmem_load_hash_library(self, n_hashes):
+        self.plugin.load_hash_library(self.path)
@@ -0,0 +1,75 @@
+"""
+Benchmarks of saving and hashing figures.
+"""
+
+import io
+import os
+import tempfile
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+
+from pytest_mpl.plugin import _hash_file
+
+from .common import FIGURE_SIZES, make_figure, make_item, make_plugin
+
+
+class SaveFigure:
+    """
+    Time `ImageComparison.save_figure` for each file format.
+    """
+    params = (list(FIGURE_SIZES), ['png', 'pdf', 'svg', 'eps'])
+    param_names = ['size', 'format']
+
+    def setup(self, size, fmt):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.plugin = make_plugin(self.tmp_dir.name)
+        self.item = make_item(self.plugin, self.tmp_dir.name, savefig_kwargs={'format': fmt})
+        self.fig = make_figure(size)
+        self.filename = Path(self.tmp_dir.name) / f'result.{fmt}'
+
+    def teardown(self, size, fmt):
+        plt.close(self.fig)
+        self.tmp_dir.cleanup()
+
+    def time_save_figure(self, size, fmt):
+        self.plugin.save_figure(self.item, self.fig, self.filename)
+
+    def peakmem_save_figure(self, size, fmt):
+        self.plugin.save_figure(self.item, self.fig, self.filename)
+
+
+class GenerateImageHash:
+    """
+    Time `ImageComparison.generate_image_hash`, which also closes the figure.
+    """
+    params = list(FIGURE_SIZES)
+    param_names = ['size']
+    number = 1  # The figure is closed, so needs to be created for each call
+
+    def setup(self, size):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.plugin = make_plugin(self.tmp_dir.name)
+        self.item = make_item(self.plugin, self.tmp_dir.name)
+        self.fig = make_figure(size)
+
+    def teardown(self, size):
+        plt.close(self.fig)
+        self.tmp_dir.cleanup()
+
+    def time_generate_image_hash(self, size):
+        self.plugin.generate_image_hash(self.item, self.fig)
+
+
+class HashFile:
+    """
+    Time hashing an image of a given number of bytes.
+    """
+    params = [10_000, 1_000_000, 10_000_000]
+    param_names = ['bytes']
+
+    def setup(self, n_bytes):
+        self.stream = io.BytesIO(os.urandom(n_bytes))
+
+    def time_hash_file(self, n_bytes):
+        _hash_file(self.stream)
@@ -0,0 +1,38 @@
+"""
+Benchmarks of generating the summaries of a test session.
+"""
+
+import tempfile
+from pathlib import Path
+
+from pytest_mpl.summary.html import generate_summary_basic_html, generate_summary_html
+
+from .common import make_plugin, make_results
+
+
+class GenerateSummary:
+    """
+    Time generating each kind of summary for a given number of figure tests.
+    """
+    params = ([10, 100, 1000], ['json', 'html', 'basic-html'])
+    param_names = ['tests', 'summary']
+
+    def setup(self, n_tests, summary):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.plugin = make_plugin(self.tmp_dir.name)
+        self.plugin._test_results = make_results(self.tmp_dir.name, n_tests)
+        self.results_dir = Path(self.plugin.results_dir)
+
+    def teardown(self, n_tests, summary):
+        self.tmp_dir.cleanup()
+
+    def time_generate_summary(self, n_tests, summary):
+        if summary == 'json':
+            self.plugin.generate_summary_json()
+        elif summary == 'html':
+            generate_summary_html(self.plugin._test_results, self.results_dir)
+        else:
+            generate_summary_basic_html(self.plugin._test_results, self.results_dir)
+
+    def peakmem_generate_summary(self, n_tests, summary):
+        self.time_generate_summary(n_tests, summary)
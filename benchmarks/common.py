@@ -0,0 +1,135 @@
+"""
+Helpers shared by the benchmarks.
+
+The benchmarks call the methods of `pytest_mpl.plugin.ImageComparison`
+directly, with stand-ins for the pytest config and the item of a figure test,
+so that the overhead of the plugin is measured without that of pytest.
+"""
+
+import copy
+import json
+from types import SimpleNamespace
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pytest  # noqa: E402
+
+from pytest_mpl.plugin import ImageComparison, generate_test_name  # noqa: E402
+
+# Number of data points, and size in inches, of each size of synthetic figure
+FIGURE_SIZES = {
+    'small': (100, (4, 3)),
+    'medium': (5000, (8, 6)),
+    'large': (20000, (16, 12)),
+}
+
+TEST_FILE = 'test_benchmark.py'
+
+
+def make_figure(size, seed=0):
+    """
+    Create a synthetic figure with a line plot, a scatter plot and an image.
+    """
+    n, figsize = FIGURE_SIZES[size]
+    rng = np.random.default_rng(seed)
+    fig, (ax1, ax2, ax3) = plt.subplots(1, 3, figsize=figsize)
+    ax1.plot(np.cumsum(rng.normal(size=n)))
+    ax1.set_title('line')
+    ax2.scatter(rng.random(n), rng.random(n), s=2, c=rng.random(n))
+    ax2.set_title('scatter')
+    side = int(np.sqrt(n))
+    ax3.imshow(rng.random((side, side)))
+    ax3.set_title('image')
+    return fig
+
+
+class _HookCaller:
+    def get_hookimpls(self):
+        return []
+
+
+def make_plugin(test_dir, **kwargs):
+    """
+    Create an `ImageComparison` plugin writing its results in ``test_dir``.
+    """
+    config = SimpleNamespace(
+        option=SimpleNamespace(verbose=0, log_cli_format=None),
+        hook=SimpleNamespace(pytest_mpl_figure_rendered=_HookCaller()),
+        rootdir=str(test_dir),
+        pytest_mpl_uid='benchmarks',
+    )
+    kwargs.setdefault('deterministic', True)
+    plugin = ImageComparison(config, **kwargs)
+    plugin.results_dir = Path(test_dir) / 'results'
+    plugin.results_dir.mkdir(parents=True, exist_ok=True)
+    return plugin
+
+
+def make_item(plugin, test_dir, name='test_figure', **marker_kwargs):
+    """
+    Create a stand-in for a test item marked with ``mpl_image_compare``.
+    """
+    mark = pytest.mark.mpl_image_compare(**marker_kwargs).mark
+    path = Path(test_dir) / TEST_FILE
+    return SimpleNamespace(
+        name=name,
+        path=path,
+        fspath=str(path),
+        cls=None,
+        module=SimpleNamespace(__name__=path.stem),
+        config=plugin.config,
+        get_closest_marker=lambda marker: mark if marker == mark.name else None,
+    )
+
+
+def make_results(test_dir, n_tests, seed=0):
+    """
+    Create the results of ``n_tests`` figure tests, as stored in
+    ``ImageComparison._test_results``, of which about 10% failed.
+
+    The plugin compares a figure which matches its baselines and one which
+    doesn't in hybrid mode, and the results of the tests are copies of theirs,
+    with the image paths changed for each test.
+    """
+    test_dir = Path(test_dir)
+    baseline_dir = test_dir / 'baseline'
+    hash_library = test_dir / 'hashes.json'
+
+    generator = make_plugin(test_dir, generate_dir=baseline_dir)
+    hashes = {}
+    for outcome in ['match', 'diff']:
+        # The baselines of the failing test are of a different figure
+        item = make_item(generator, test_dir, name=f'test_{outcome}')
+        baseline_seed = 0 if outcome == 'match' else 1
+        generator.generate_baseline_image(item, make_figure('small', seed=baseline_seed))
+        hashes[generate_test_name(item)] = generator.generate_image_hash(item, make_figure('small', seed=baseline_seed))
+    write_hash_library(hash_library, hashes)
+
+    plugin = make_plugin(test_dir, baseline_dir=baseline_dir, hash_library=hash_library)
+    templates = {}
+    for outcome in ['match', 'diff']:
+        item = make_item(plugin, test_dir, name=f'test_{outcome}')
+        templates[outcome] = plugin.new_summary(item)
+        plugin._timings = templates[outcome]['timings']  # As while running a test
+        plugin.compare_image_to_hash_library(item, make_figure('small', seed=0), plugin.make_test_results_dir(item),
+                                             summary=templates[outcome])
+
+    rng = np.random.default_rng(seed)
+    results = {}
+    for i in range(n_tests):
+        summary = copy.deepcopy(templates['match' if rng.random() < 0.9 else 'diff'])
+        for key in ['baseline_image', 'diff_image', 'result_image']:
+            if summary[key] is not None:
+                summary[key] = f"test_module_{i // 100}.test_figure_{i}/{summary[key].split('/', 1)[1]}"
+        results[f'test_module_{i // 100}.test_figure[{i}]'] = summary
+    return results
+
+
+def write_hash_library(path, hashes):
+    with open(path, 'w') as f:
+        json.dump(hashes, f, indent=2)
@@ -0,0 +1,257 @@
+"""
+End-to-end benchmark of test sessions with many figure tests.
+
+A corpus of figure tests, with their baseline images and hash library, is
+generated, and then run in the hash, image and hybrid modes, with and without
+pytest-xdist and an HTML summary. For each run the wall time, the peak
+resident memory of pytest and of its largest xdist worker, the time taken by
+the end of session tasks, the time the xdist controller spends merging the
+results of its workers, and the size of the results directory are reported
+as a JSON table::
+
+    python -m benchmarks.scaling --tests 1000,10000 --json scaling.json
+
+The runs are not traced unless ``--trace`` is given, since the tracer's own
+overhead would then be included in the measurements.
+
+The runs use `pytest.Pytester`, so each gets its own temporary directory.
+Memory usage is measured with the `resource` module, which is only
+available on Unix.
+"""
+
+import sys
+import json
+import argparse
+import itertools
+import subprocess
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+TESTS = [1000]
+WORKERS = [0, 4]
+MODES = ['hash', 'image', 'hybrid']
+SUMMARIES = ['none', 'html']
+
+# Number of figure tests in each module of the corpus
+MODULE_SIZE = 1000
+
+CORPUS_MODULE = """
+import matplotlib.pyplot as plt
+import pytest
+
+
+@pytest.mark.parametrize("i", range({start}, {stop}))
+@pytest.mark.mpl_image_compare(deterministic=True)
+def test_figure(i):
+    fig, ax = plt.subplots(figsize=(2, 2))
+    ax.plot([0, 1, 2], [0, i % 7, i % 3])
+    return fig
+"""
+
+# Run pytest, then print its peak memory usage and the time spent in some of
+# the pytest-mpl hooks of the main process. The peak usage of the children is
+# that of the largest xdist worker, since the workers are separate processes.
+# The end of session tasks are timed with `pytest_sessionfinish`, and the
+# merging of the worker results by the xdist controller with
+# `pytest_runtest_logreport` and `pytest_testnodedown`.
+MEASURE_SCRIPT = """
+import sys, json, time, resource, pytest
+
+HOOKS = {'pytest_sessionfinish': 'session_time',
+         'pytest_runtest_logreport': 'merge_time', 'pytest_testnodedown': 'merge_time'}
+timings = dict.fromkeys(HOOKS.values(), 0.0)
+
+def timed(function, key):
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            timings[key] += time.perf_counter() - start
+    return wrapper
+
+class Timer:
+    @pytest.hookimpl(trylast=True)
+    def pytest_configure(self, config):
+        # pytest-mpl registers its plugins in its own `pytest_configure`
+        for name, key in HOOKS.items():
+            if not hasattr(config.hook, name):  # The xdist hooks, when run without xdist
+                continue
+            for impl in getattr(config.hook, name).get_hookimpls():
+                if type(impl.plugin).__module__.startswith('pytest_mpl.'):
+                    impl.function = timed(impl.function, key)
+
+code = pytest.main(sys.argv[1:], plugins=[Timer()])
+scale = 1 if sys.platform == 'darwin' else 1024  # ru_maxrss is in KiB on Linux
+print('pytest-mpl-scaling ' + json.dumps({
+    'peak_rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale,
+    'peak_rss_workers': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale,
+    **timings,
+}))
+sys.exit(code)
+"""
+
+COLUMNS = ['tests', 'mode', 'workers', 'summary', 'wall_time', 'session_time',
+           'merge_time', 'peak_rss', 'peak_rss_workers', 'artifact_bytes']
+
+
+class ScalingBenchmark:
+    """
+    Plugin holding the configuration of the benchmark, and collecting its results.
+    """
+    name = 'pytest-mpl-scaling'
+
+    def __init__(self, tests=TESTS, modes=MODES, workers=WORKERS, summaries=SUMMARIES, json_path=None,
+                 trace_dir=None):
+        self.tests = tests
+        self.modes = modes
+        if importlib.util.find_spec('xdist') is None:
+            workers = [n for n in workers if n == 0]
+        self.workers = workers
+        self.summaries = summaries
+        self.json_path = json_path
+        self.trace_dir = trace_dir
+        self.rows = []
+
+    def runs(self):
+        return list(itertools.product(self.tests, self.modes, self.workers, self.summaries))
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.rows:
+            return
+        terminalreporter.section('pytest-mpl scaling')
+        terminalreporter.write_line(' '.join(f'{column:>16}' for column in COLUMNS))
+        for row in self.rows:
+            terminalreporter.write_line(' '.join(f'{_format(row[column]):>16}' for column in COLUMNS))
+        if self.json_path is not None:
+            with open(self.json_path, 'w') as f:
+                json.dump(self.rows, f, indent=2)
+            terminalreporter.write_line(f'The results can be found at: {self.json_path}')
+
+
+def _format(value):
+    if isinstance(value, float):
+        return f'{value:.3f}'
+    return str(value)
+
+
+def _get_benchmark(config):
+    # Compare by name, since `main` is not run from the imported test module
+    for plugin in config.pluginmanager.get_plugins():
+        if getattr(plugin, 'name', None) == ScalingBenchmark.name:
+            return plugin
+    benchmark = ScalingBenchmark()  # Run with pytest directly, rather than with `main`
+    config.pluginmanager.register(benchmark)
+    return benchmark
+
+
+def pytest_generate_tests(metafunc):
+    if 'run' in metafunc.fixturenames:
+        runs = _get_benchmark(metafunc.config).runs()
+        metafunc.parametrize('run', runs, ids=['-'.join(map(str, run)) for run in runs])
+
+
+@pytest.fixture(scope='session')
+def corpus(tmp_path_factory):
+    """
+    Return a function which generates, or reuses, a corpus of ``n_tests`` figure
+    tests with their baseline images and hash library.
+    """
+    corpora = {}
+
+    def get_corpus(n_tests):
+        if n_tests not in corpora:
+            path = tmp_path_factory.mktemp(f'corpus{n_tests}')
+            for start in range(0, n_tests, MODULE_SIZE):
+                module = CORPUS_MODULE.format(start=start, stop=min(start + MODULE_SIZE, n_tests))
+                (path / f'test_corpus_{start // MODULE_SIZE:03d}.py').write_text(module)
+            subprocess.run([sys.executable, '-m', 'pytest', '-q', '-p', 'no:cacheprovider',
+                            '--mpl-generate-path=baseline', '--mpl-generate-hash-library=hashes.json'],
+                           cwd=path, check=True, stdout=subprocess.DEVNULL)
+            corpora[n_tests] = path
+        return corpora[n_tests]
+
+    return get_corpus
+
+
+def test_scaling(pytester, corpus, run, request):
+    n_tests, mode, workers, summary = run
+    path = corpus(n_tests)
+    results_dir = pytester.path / 'results'
+    benchmark = _get_benchmark(request.config)
+
+    args = [str(path), '-q', '-p', 'no:cacheprovider', '--mpl', f'--mpl-results-path={results_dir}']
+    if benchmark.trace_dir is not None:
+        trace = Path(benchmark.trace_dir).absolute() / f"{'-'.join(map(str, run))}.json"
+        trace.parent.mkdir(parents=True, exist_ok=True)
+        args.append(f'--mpl-trace={trace}')
+    if mode in ('hash', 'hybrid'):
+        args.append(f'--mpl-hash-library={path / "hashes.json"}')
+    if mode in ('image', 'hybrid'):
+        args.append(f'--mpl-baseline-path={path / "baseline"}')
+    args += ['-n', str(workers)] if workers else ['-p', 'no:xdist']
+    if summary != 'none':
+        args.append(f'--mpl-generate-summary={summary}')
+
+    result = pytester.run(sys.executable, '-c', MEASURE_SCRIPT, *args)
+    result.assert_outcomes(passed=n_tests)
+
+    line, = [line for line in result.outlines if line.startswith('pytest-mpl-scaling ')]
+    usage = json.loads(line.split(' ', 1)[1])
+    artifact_bytes = sum(file.stat().st_size for file in results_dir.rglob('*') if file.is_file())
+
+    benchmark.rows.append({
+        'tests': n_tests,
+        'mode': mode,
+        'workers': workers,
+        'summary': summary,
+        'wall_time': result.duration,
+        'session_time': usage['session_time'],
+        'merge_time': usage['merge_time'] if workers else None,
+        'peak_rss': usage['peak_rss'],
+        'peak_rss_workers': usage['peak_rss_workers'] if workers else None,
+        'artifact_bytes': artifact_bytes,
+    })
+
+
+def _int_list(value):
+    return [int(i) for i in value.split(',')]
+
+
+def _str_list(choices):
+    def parse(value):
+        values = value.split(',')
+        for i in values:
+            if i not in choices:
+                raise argparse.ArgumentTypeError(f'{i!r} is not one of {", ".join(choices)}')
+        return values
+    return parse
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.scaling',
+                                     description='End-to-end benchmark of test sessions with many figure tests.')
+    parser.add_argument('--tests', type=_int_list, default=TESTS,
+                        help='Comma-separated numbers of figure tests to run (default: 1000).')
+    parser.add_argument('--modes', type=_str_list(MODES), default=MODES,
+                        help=f'Comma-separated comparison modes (default: {",".join(MODES)}).')
+    parser.add_argument('--workers', type=_int_list, default=WORKERS,
+                        help='Comma-separated numbers of xdist workers, 0 to run without xdist (default: 0,4).')
+    parser.add_argument('--summaries', type=_str_list(SUMMARIES), default=SUMMARIES,
+                        help=f'Comma-separated summaries to generate (default: {",".join(SUMMARIES)}).')
+    parser.add_argument('--json', help='Also write the results to this JSON file.')
+    parser.add_argument('--trace', metavar='DIR',
+                        help='Also record a trace of each run in this directory. The overhead of '
+                             'the tracer is then included in the results.')
+    args = parser.parse_args(args)
+
+    benchmark = ScalingBenchmark(tests=args.tests, modes=args.modes, workers=args.workers,
+                                 summaries=args.summaries, json_path=args.json, trace_dir=args.trace)
+    return pytest.main([__file__, '-p', 'pytester', '-p', 'no:xdist', '-p', 'no:cacheprovider', '-q'],
+                       plugins=[benchmark])
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Profiling of the time taken to draw each artist of a figure.
+
+While a figure is saved, the ``draw`` methods of the classes of all the
+artists in the figure are temporarily wrapped, so that the time spent drawing
+each artist, excluding the time spent drawing its children, can be added up
+per artist class and per axes.
+"""
+
+import time
+import functools
+import contextlib
+
+__all__ = ['DrawProfiler', 'count_artist_points']
+
+
+def count_artist_points(artist):
+    """
+    Return the number of path vertices and of data points (collection
+    offsets or image pixels) of an artist.
+    """
+    from matplotlib.collections import Collection
+    from matplotlib.image import _ImageBase
+    from matplotlib.lines import Line2D
+    from matplotlib.patches import Patch
+
+    vertices = points = 0
+    try:
+        if isinstance(artist, Line2D):
+            vertices = len(artist.get_xydata())
+        elif isinstance(artist, Collection):
+            vertices = sum(len(path.vertices) for path in artist.get_paths())
+            points = len(artist.get_offsets())
+        elif isinstance(artist, Patch):
+            vertices = len(artist.get_path().vertices)
+        elif isinstance(artist, _ImageBase):
+            array = artist.get_array()
+            if array is not None:
+                points = array.shape[0] * array.shape[1]
+    except Exception:  # Counting is best effort, and must not break the test
+        pass
+    return vertices, points
+
+
+class DrawProfiler:
+    """
+    Time the ``draw`` methods of artists while figures are saved.
+
+    The statistics are accumulated over all the figures profiled with
+    `DrawProfiler.profile`, and returned by `DrawProfiler.results`.
+    """
+
+    def __init__(self):
+        self._classes = {}
+        self._axes = {}
+        self._stack = []  # [artist, time spent drawing children] of the artists being drawn
+        self._drawn = {}
+
+    def _wrap(self, draw):
+
+        @functools.wraps(draw)
+        def draw_wrapper(artist, *args, **kwargs):
+            # Calls to the draw method of a parent class are part of the same draw
+            if self._stack and self._stack[-1][0] is artist:
+                return draw(artist, *args, **kwargs)
+            entry = [artist, 0.0]
+            self._stack.append(entry)
+            start = time.perf_counter()
+            try:
+                return draw(artist, *args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                self._stack.pop()
+                if self._stack:
+                    self._stack[-1][1] += elapsed
+                self._record(artist, elapsed - entry[1])
+
+        return draw_wrapper
+
+    def _record(self, artist, seconds):
+        name = type(artist).__name__
+        stats = self._classes.setdefault(name, {'calls': 0, 'time': 0.0, 'vertices': 0, 'points': 0})
+        stats['calls'] += 1
+        stats['time'] += seconds
+        self._drawn[id(artist)] = artist
+
+        from matplotlib.axes import Axes
+        axes = artist if isinstance(artist, Axes) else getattr(artist, 'axes', None)
+        if isinstance(axes, Axes):  # `Figure.axes` is the list of all the axes
+            self._axes.setdefault(id(axes), [axes, 0.0])[1] += seconds
+
+    @contextlib.contextmanager
+    def profile(self, fig):
+        """
+        Profile the drawing of the artists of ``fig`` within the block.
+        """
+        classes = set()
+        for cls in {type(artist) for artist in fig.findobj()}:
+            classes.update(base for base in cls.__mro__ if 'draw' in vars(base))
+        originals = {cls: vars(cls)['draw'] for cls in classes}
+        for cls, draw in originals.items():
+            setattr(cls, 'draw', self._wrap(draw))
+        try:
+            yield
+        finally:
+            for cls, draw in originals.items():
+                setattr(cls, 'draw', draw)
+            for artist in self._drawn.values():
+                vertices, points = count_artist_points(artist)
+                stats = self._classes[type(artist).__name__]
+                stats['vertices'] += vertices
+                stats['points'] += points
+            self._drawn = {}
+            self._stack = []
+            self._name_axes(fig)
+
+    def _name_axes(self, fig):
+        for i, ax in enumerate(getattr(fig, 'axes', [])):
+            if id(ax) in self._axes and len(self._axes[id(ax)]) == 2:
+                title = ax.get_title()
+                self._axes[id(ax)].append(f"axes[{i}] {title!r}" if title else f"axes[{i}]")
+
+    def results(self, top=None):
+        """
+        Return the artist classes and the axes which took the longest to draw.
+
+        Parameters
+        ----------
+        top : int, optional
+            The number of artist classes and axes to return. All are returned if
+            not set, or if less than one.
+
+        Returns
+        -------
+        dict
+            With ``classes``, a list of dictionaries with the ``name``, number of
+            draw ``calls``, total ``time`` in seconds and number of ``vertices`` and
+            ``points`` drawn of each artist class, and ``axes``, a list of dictionaries
+            with the ``name`` and total ``time`` of each axes. Both are sorted by time,
+            slowest first.
+        """
+        classes = [{'name': name, **stats} for name, stats in self._classes.items()]
+        classes.sort(key=lambda stats: stats['time'], reverse=True)
+        axes = [{'name': entry[2] if len(entry) > 2 else 'axes', 'time': entry[1]}
+                for entry in self._axes.values()]
+        axes.sort(key=lambda stats: stats['time'], reverse=True)
+        if top is not None and top > 0:
+            classes, axes = classes[:top], axes[:top]
+        return {'classes': classes, 'axes': axes}
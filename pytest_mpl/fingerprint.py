@@ -0,0 +1,130 @@
+"""
+Fingerprints of the code which draws the figure of a test.
+
+The fingerprint of a function covers its source, the sources of the
+functions, classes and simple constants of its module which it uses, and the
+contents of the project modules imported by its module, directly or through
+other project modules. Project modules are those within the root directory
+of the project, excluding installed packages.
+"""
+
+import sys
+import types
+import hashlib
+import inspect
+from pathlib import Path
+
+__all__ = ['CodeFingerprinter']
+
+# Types of module-level constants which are fingerprinted by their repr
+SIMPLE_TYPES = (type(None), bool, int, float, complex, str, bytes, tuple, list, dict, set, frozenset)
+
+
+class CodeFingerprinter:
+    """
+    Compute fingerprints of test functions, caching those of modules.
+
+    Parameters
+    ----------
+    root : str or Path
+        The root directory of the project.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root).resolve()
+        self._module_digests = {}
+        self._file_digests = {}
+        self._function_digests = {}
+
+    def _is_project_file(self, path):
+        path = Path(path).resolve()
+        return path.is_relative_to(self.root) and 'site-packages' not in path.parts
+
+    def _project_module(self, obj):
+        """
+        Return the project module which is, or which defines, ``obj``, if any.
+        """
+        if isinstance(obj, types.ModuleType):
+            module = obj
+        else:
+            module_name = getattr(obj, '__module__', None)
+            module = sys.modules.get(module_name) if isinstance(module_name, str) else None
+        filename = getattr(module, '__file__', None)
+        if filename and self._is_project_file(filename):
+            return module
+
+    def imported_modules(self, module):
+        """
+        Return the project modules imported by ``module``, directly or through
+        other project modules, sorted by name.
+        """
+        found = {}
+        pending = [module]
+        while pending:
+            for value in list(vars(pending.pop()).values()):
+                imported = self._project_module(value)
+                if imported is not None and imported is not module and imported.__name__ not in found:
+                    found[imported.__name__] = imported
+                    pending.append(imported)
+        return [found[name] for name in sorted(found)]
+
+    def _file_digest(self, filename):
+        if filename not in self._file_digests:
+            with open(filename, 'rb') as f:
+                self._file_digests[filename] = hashlib.sha256(f.read()).hexdigest()
+        return self._file_digests[filename]
+
+    def module_digest(self, module):
+        """
+        Return a digest of the contents of the project modules imported by ``module``.
+        """
+        if module.__name__ not in self._module_digests:
+            hasher = hashlib.sha256()
+            for imported in self.imported_modules(module):
+                hasher.update(f'{imported.__name__}:{self._file_digest(imported.__file__)}\n'.encode())
+            self._module_digests[module.__name__] = hasher.hexdigest()
+        return self._module_digests[module.__name__]
+
+    def digest(self, function):
+        """
+        Return the fingerprint of a function, or `None` if its source is not available.
+        """
+        if function in self._function_digests:
+            return self._function_digests[function]
+        module = inspect.getmodule(function)
+        hasher = hashlib.sha256()
+        try:
+            hasher.update(inspect.getsource(function).encode())
+            if module is not None:
+                for name in sorted(set(function.__code__.co_names) & set(vars(module))):
+                    hasher.update(self._global_source(module, name).encode())
+                hasher.update(self.module_digest(module).encode())
+        except (OSError, TypeError, AttributeError):
+            digest = None
+        else:
+            digest = hasher.hexdigest()
+        self._function_digests[function] = digest
+        return digest
+
+    def params_digest(self, params, module):
+        """
+        Return a digest of the parameters of a parametrized test from ``module``.
+        """
+        if all(isinstance(value, SIMPLE_TYPES) for value in params.values()):
+            return repr(sorted(params.items()))
+        # Other objects may not have a stable repr, so use the whole module
+        return self._file_digest(module.__file__)
+
+    def _global_source(self, module, name):
+        value = vars(module)[name]
+        if isinstance(value, types.ModuleType):
+            return ''  # Project modules are included in the module digest
+        elif inspect.isclass(value) or inspect.isroutine(value):
+            if getattr(value, '__module__', None) == module.__name__:
+                return inspect.getsource(value)
+            return ''  # Those of project modules are included in the module digest
+        elif isinstance(value, SIMPLE_TYPES):
+            return f'{name} = {value!r}'
+        else:
+            # Other objects may not have a stable repr, so use the whole module
+            return self._file_digest(module.__file__)
@@ -0,0 +1,46 @@
+"""
+Hook specifications for plugins which consume the results of figure tests.
+
+These hooks are called while each figure test runs, so under ``pytest-xdist``
+they are called in the worker running the test.
+"""
+
+
+def pytest_mpl_figure_rendered(item, fig, data):
+    """
+    Called each time the figure of a test has been saved.
+
+    Parameters
+    ----------
+    item : `pytest.Item`
+        The figure test.
+    fig : `matplotlib.figure.Figure`
+        The figure returned by the test.
+    data : bytes
+        The saved image, in the file format of the test.
+    """
+
+
+def pytest_mpl_baseline_missing(item):
+    """
+    Called when the baseline image or hash of a test could not be found.
+
+    Parameters
+    ----------
+    item : `pytest.Item`
+        The figure test.
+    """
+
+
+def pytest_mpl_comparison_result(item, summary):
+    """
+    Called once the figure of a test has been compared, or has failed to be.
+
+    Parameters
+    ----------
+    item : `pytest.Item`
+        The figure test.
+    summary : dict
+        The summary of the test, as included in the JSON summary. It should
+        not be modified.
+    """
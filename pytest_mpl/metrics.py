@@ -0,0 +1,128 @@
+"""
+Export of figure test metrics in the Prometheus text format.
+
+The metrics file is intended for the textfile collector of the Prometheus
+node exporter, so that the throughput of figure tests can be tracked over
+time. All metrics are for a single test session.
+"""
+
+import os
+import uuid
+from collections import Counter
+
+__all__ = ['generate_metrics', 'write_metrics_file']
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+RMS_BUCKETS = (0.1, 0.5, 1, 2, 5, 10, 20, 50, 100)
+
+# Histograms of the time taken by each test, and the timing phases which they include
+DURATION_HISTOGRAMS = {
+    'render': ('remove_text', 'savefig'),
+    'compare': ('hash', 'compare'),
+}
+
+
+def _labels(**labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for value in labels.values())
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + '}'
+
+
+def _value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    def __init__(self, name, kind, help):
+        self.name = name
+        self.lines = [f'# HELP {name} {help}', f'# TYPE {name} {kind}']
+
+    def sample(self, value, suffix='', **labels):
+        self.lines.append(f'{self.name}{suffix}{_labels(**labels)} {_value(value)}')
+
+    def histogram(self, values, buckets):
+        for bound in buckets:
+            self.sample(sum(value <= bound for value in values), '_bucket', le=bound)
+        self.sample(len(values), '_bucket', le='+Inf')
+        self.sample(float(sum(values)), '_sum')
+        self.sample(len(values), '_count')
+
+
+def generate_metrics(results, mirror_stats=None, manifest_hits=0, written_bytes=0):
+    """Generate the metrics of a test session.
+
+    Parameters
+    ----------
+    results : dict
+        The `pytest_mpl.plugin.ImageComparison._test_results` object.
+    mirror_stats : dict, optional
+        The statistics of each baseline mirror, as returned by
+        `pytest_mpl.plugin.MirrorHealth.stats`.
+    manifest_hits : int, optional
+        The number of baseline images which did not need to be fetched, since
+        the result matched the digest in the baseline manifest.
+    written_bytes : int, optional
+        The number of bytes written to the results directory.
+
+    Returns
+    -------
+    str
+        The metrics in the Prometheus text format.
+    """
+    metrics = []
+
+    tests = _Metric('pytest_mpl_tests_total', 'counter', 'Number of figure tests by outcome.')
+    statuses = Counter((summary['status'], summary['image_status'], summary['hash_status'])
+                       for summary in results.values())
+    for (status, image_status, hash_status), count in sorted(statuses.items(), key=str):
+        tests.sample(count, status=status, image_status=image_status or '', hash_status=hash_status or '')
+    metrics.append(tests)
+
+    for name, phases in DURATION_HISTOGRAMS.items():
+        durations = [sum(summary['timings'].get(phase, 0.0) for phase in phases)
+                     for summary in results.values() if summary.get('timings')]
+        histogram = _Metric(f'pytest_mpl_{name}_duration_seconds', 'histogram',
+                            f'Time taken to {name} the figure of each test.')
+        histogram.histogram(durations, DURATION_BUCKETS)
+        metrics.append(histogram)
+
+    rms = _Metric('pytest_mpl_rms', 'histogram',
+                  'RMS difference between the result and baseline images of each test.')
+    rms.histogram([summary['rms'] for summary in results.values() if summary.get('rms') is not None],
+                  RMS_BUCKETS)
+    metrics.append(rms)
+
+    written = _Metric('pytest_mpl_written_bytes_total', 'counter', 'Bytes written to the results directory.')
+    written.sample(written_bytes)
+    metrics.append(written)
+
+    downloads = _Metric('pytest_mpl_baseline_downloads_total', 'counter',
+                        'Number of baseline downloads from each mirror by result.')
+    for url, stats in sorted((mirror_stats or {}).items()):
+        for result, key in [('downloaded', 'successes'), ('not_found', 'misses'), ('failed', 'failures')]:
+            downloads.sample(stats[key], mirror=url, result=result)
+    metrics.append(downloads)
+
+    hits = _Metric('pytest_mpl_baseline_manifest_hits_total', 'counter',
+                   'Number of baseline images not fetched since the result matched the manifest.')
+    hits.sample(manifest_hits)
+    metrics.append(hits)
+
+    return '\n'.join(line for metric in metrics for line in metric.lines) + '\n'
+
+
+def write_metrics_file(path, results, **kwargs):
+    """Write the metrics of a test session to a file.
+
+    The file is replaced atomically, so that the textfile collector never
+    reads a partially written file. See `generate_metrics` for the parameters.
+    """
+    path = os.path.abspath(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(generate_metrics(results, **kwargs))
+    os.replace(tmp_path, path)
+    return path
@@ -28,22 +28,39 @@
 #
 #   https://github.com/astrofrog/wcsaxes
 
+import gc
 import io
 import os
+import sys
 import json
+import math
+import time
 import uuid
 import shutil
 import hashlib
 import logging
+import weakref
+import cProfile
 import tempfile
 import warnings
+import itertools
+import threading
 import contextlib
+import tracemalloc
 from pathlib import Path
+from urllib.error import HTTPError
 from urllib.request import urlopen
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import pytest
 from packaging.version import Version
 
+from pytest_mpl import __version__
+from pytest_mpl.draw_profile import DrawProfiler
+from pytest_mpl.fingerprint import CodeFingerprinter
+from pytest_mpl.metrics import write_metrics_file
+from pytest_mpl.storage import (FileSystemStorage, create_once, get_storage_backend,
+                                resolve_location, write_temporary)
 from pytest_mpl.summary.html import generate_summary_basic_html, generate_summary_html
 
 DEFAULT_STYLE = "classic"
@@ -60,6 +77,35 @@ SHAPE_MISMATCH_ERROR = """Error: Image dimensions did not match.
 
 PYTEST_LT_7 = Version(pytest.__version__) < Version("7.0.0")
 
+# Number of consecutive connection failures after which a baseline mirror is
+# skipped, and the number of seconds it is skipped for before being retried
+MIRROR_FAILURE_THRESHOLD = 3
+MIRROR_COOLDOWN = 60
+
+# Keys in the pytest cache of the fingerprints of the figure tests which passed,
+# and of the outcomes of the figure tests the last time they were run
+SKIP_UNCHANGED_CACHE_KEY = "pytest-mpl/skip-unchanged"
+LAST_OUTCOMES_CACHE_KEY = "pytest-mpl/last-outcomes"
+
+# Phases of a figure test which are timed, in the order they happen
+TIMING_PHASES = ('test', 'remove_text', 'savefig', 'hash', 'baseline_fetch', 'compare', 'artifacts')
+
+# Columns of the --mpl-durations table, and the timing phases which they include
+DURATION_COLUMNS = {
+    'test': ('test',),
+    'render': ('remove_text', 'savefig'),
+    'hash': ('hash',),
+    'compare': ('compare',),
+    'I/O': ('baseline_fetch', 'artifacts'),
+}
+
+# Phases of a figure test whose memory usage is tracked, and the timing phases which they include
+MEMORY_PHASES = {
+    'test': ('test',),
+    'render': ('remove_text', 'savefig'),
+    'compare': ('hash', 'compare'),
+}
+
 # The following are the subsets of formats supported by the Matplotlib image
 # comparison machinery
 RASTER_IMAGE_FORMATS = ['png']
@@ -111,6 +157,14 @@ def generate_test_name(item):
     return name
 
 
+def failed_outcome(outcome):
+    """
+    Whether the outcome of a figure test, as stored in the pytest cache, is a
+    failure or a missing baseline.
+    """
+    return outcome['status'] == 'failed' or 'missing' in (outcome['image_status'], outcome['hash_status'])
+
+
 def wrap_figure_interceptor(plugin, item):
     """
     Intercept and store figures returned by test functions.
@@ -129,6 +183,11 @@ def wrap_figure_interceptor(plugin, item):
         item.obj = figure_interceptor(plugin, item.obj)
 
 
+def pytest_addhooks(pluginmanager):
+    from pytest_mpl import hooks
+    pluginmanager.add_hookspecs(hooks)
+
+
 def pytest_report_header():
     import matplotlib
     import matplotlib.ft2font
@@ -161,6 +220,174 @@ def pytest_addoption(parser):
     msg = "interpret the baseline directory as relative to the test location."
     group.addoption("--mpl-baseline-relative", help=msg, action="store_true")
 
+    msg = (
+        "when the baseline directory is a set of comma-separated URLs, download "
+        "from the two fastest mirrors concurrently and use the first response"
+    )
+    option = "mpl-race-mirrors"
+    group.addoption(f"--{option}", help=msg, action="store_true")
+    parser.addini(option, help=msg, type="bool")
+
+    msg = (
+        "reorder figure tests within each module or class so that tests using the same "
+        "backend, style and file format run consecutively"
+    )
+    option = "mpl-group-by-config"
+    group.addoption(f"--{option}", help=msg, action="store_true")
+    parser.addini(option, help=msg, type="bool")
+
+    msg = (
+        "leave the backend of the last figure test active until a test needs a different "
+        "one, and restore the original backend before unmarked tests and at the end of the session"
+    )
+    option = "mpl-sticky-backend"
+    group.addoption(f"--{option}", help=msg, action="store_true")
+    parser.addini(option, help=msg, type="bool")
+
+    msg = (
+        "build the matplotlib font cache in a directory shared by all workers, and render "
+        "a figure with the default style and backend before running any tests"
+    )
+    option = "mpl-warmup"
+    group.addoption(f"--{option}", help=msg, action="store_true")
+    parser.addini(option, help=msg, type="bool")
+
+    msg = (
+        "fail if a figure returned by a test is still referenced after the test and its "
+        "fixtures have finished"
+    )
+    option = "mpl-check-released"
+    group.addoption(f"--{option}", help=msg, action="store_true")
+    parser.addini(option, help=msg, type="bool")
+
+    msg = "close figures left open by figure tests and report them"
+    option = "mpl-check-leaks"
+    group.addoption(f"--{option}", help=msg, action="store_true")
+    parser.addini(option, help=msg, type="bool")
+
+    msg = "whether tests which leak figures fail or emit a warning (default warn)"
+    option = "mpl-check-leaks-mode"
+    group.addoption(f"--{option}", help=msg, choices=["warn", "fail"])
+    parser.addini(option, help=msg)
+
+    msg = (
+        "show the N slowest figure tests (N=0 for all), with the time spent rendering, "
+        "hashing, comparing and reading or writing files, and the total time of each phase"
+    )
+    option = "mpl-durations"
+    group.addoption(f"--{option}", help=msg, action="store", type=int, metavar="N")
+    parser.addini(option, help=msg)
+
+    msg = (
+        "profile figure tests with cProfile and save the profile to profile.prof in the "
+        "results directory of each test"
+    )
+    option = "mpl-profile"
+    group.addoption(f"--{option}", help=msg, action="store_true")
+    parser.addini(option, help=msg, type="bool")
+
+    msg = "discard the profiles of figure tests which take less than this many seconds"
+    option = "mpl-profile-threshold"
+    group.addoption(f"--{option}", help=msg, action="store", type=float, metavar="SECONDS")
+    parser.addini(option, help=msg)
+
+    msg = (
+        "time the drawing of each artist while saving figures, and record the artist "
+        "classes and axes which took the longest to draw"
+    )
+    option = "mpl-profile-artists"
+    group.addoption(f"--{option}", help=msg, action="store_true")
+    parser.addini(option, help=msg, type="bool")
+
+    msg = "number of artist classes and axes to record with --mpl-profile-artists (default 10, 0 for all)"
+    option = "mpl-profile-artists-count"
+    group.addoption(f"--{option}", help=msg, action="store", type=int, metavar="N")
+    parser.addini(option, help=msg)
+
+    msg = (
+        "record the peak memory allocated by figure tests with tracemalloc, and the change "
+        "in resident memory, while running the test, rendering and comparing the figure"
+    )
+    option = "mpl-track-memory"
+    group.addoption(f"--{option}", help=msg, action="store_true")
+    parser.addini(option, help=msg, type="bool")
+
+    msg = (
+        "write a timeline of the figure tests to a JSON file in the Trace Event Format, "
+        "which can be opened with Perfetto or chrome://tracing"
+    )
+    option = "mpl-trace"
+    group.addoption(f"--{option}", help=msg, action="store", metavar="PATH")
+    parser.addini(option, help=msg)
+
+    msg = (
+        "default maximum time in seconds that saving the figure may take, unless "
+        "specified with max_render_time in the mpl_image_compare decorator"
+    )
+    option = "mpl-default-max-render-time"
+    group.addoption(f"--{option}", help=msg, action="store", type=float, metavar="SECONDS")
+    parser.addini(option, help=msg)
+
+    msg = (
+        "factor to scale the render time budgets by, for machines which are slower or "
+        "faster than the one the budgets were set on"
+    )
+    option = "mpl-render-time-factor"
+    group.addoption(f"--{option}", help=msg, action="store", type=float, metavar="FACTOR")
+    parser.addini(option, help=msg)
+
+    msg = "whether tests which exceed their render time budget fail or emit a warning"
+    option = "mpl-render-time-mode"
+    group.addoption(f"--{option}", help=msg, choices=["fail", "warn"])
+    parser.addini(option, help=msg)
+
+    msg = (
+        "write metrics of the figure tests at the end of the session to a file in the "
+        "Prometheus text format, for the node exporter textfile collector"
+    )
+    option = "mpl-metrics-file"
+    group.addoption(f"--{option}", help=msg, action="store", metavar="PATH")
+    parser.addini(option, help=msg)
+
+    msg = (
+        "skip figure tests which passed in a previous run and are unchanged since, "
+        "i.e. their code, marker, baseline, and the matplotlib and freetype versions"
+    )
+    option = "mpl-skip-unchanged"
+    group.addoption(f"--{option}", help=msg, action="store_true")
+    parser.addini(option, help=msg, type="bool")
+
+    msg = (
+        "only run the figure tests which failed, or whose baseline was missing, "
+        "the last time they were run, and the tests without the marker "
+        "(all tests are run if none failed)"
+    )
+    group.addoption("--mpl-last-failed", help=msg, action="store_true")
+
+    msg = (
+        "run the figure tests which failed, or whose baseline was missing, "
+        "the last time they were run before the other tests"
+    )
+    group.addoption("--mpl-failed-first", help=msg, action="store_true")
+
+    msg = (
+        "only run a deterministic sample of this fraction of the figure tests, selected "
+        "by hashing their names, and deselect the others (not used when generating)"
+    )
+    option = "mpl-sample"
+    group.addoption(f"--{option}", help=msg, action="store", type=float, metavar="FRACTION")
+    parser.addini(option, help=msg)
+
+    msg = "seed used to select the sample of figure tests, to choose a different sample"
+    option = "mpl-sample-seed"
+    group.addoption(f"--{option}", help=msg, action="store", metavar="SEED")
+    parser.addini(option, help=msg)
+
+    msg = "sample the same fraction of the figure tests of each module, and at least one"
+    option = "mpl-sample-by-module"
+    group.addoption(f"--{option}", help=msg, action="store_true")
+    parser.addini(option, help=msg, type="bool")
+
     msg = "json library of image hashes, relative to location where py.test is run"
     option = "mpl-hash-library"
     group.addoption(f"--{option}", help=msg, action="store")
@@ -218,10 +445,26 @@ def pytest_addoption(parser):
 
 
 class XdistPlugin:
+    def __init__(self, plugin):
+        self.plugin = plugin
+
     def pytest_configure_node(self, node):
         node.workerinput["pytest_mpl_uid"] = node.config.pytest_mpl_uid
         node.workerinput["pytest_mpl_results_dir"] = node.config.pytest_mpl_results_dir
 
+    def pytest_testnodedown(self, node, error):
+        workeroutput = getattr(node, "workeroutput", {})
+        if "pytest_mpl_mirror_stats" in workeroutput:
+            self.plugin._mirror_health.merge(workeroutput["pytest_mpl_mirror_stats"])
+        self.plugin._warmup_times.extend(workeroutput.get("pytest_mpl_warmup_times", []))
+        self.plugin._warmup_errors.extend(workeroutput.get("pytest_mpl_warmup_errors", []))
+        self.plugin._trace_events.extend(workeroutput.get("pytest_mpl_trace_events", []))
+        self.plugin._manifest_hits += workeroutput.get("pytest_mpl_manifest_hits", 0)
+        self.plugin._collected_tests.update(workeroutput.get("pytest_mpl_collected_tests", {}))
+        # Every worker collects and selects the same tests
+        if not self.plugin._worker_collection_messages:
+            self.plugin._worker_collection_messages = workeroutput.get("pytest_mpl_collection_messages", [])
+
 
 def pytest_configure(config):
 
@@ -237,7 +480,11 @@ def pytest_configure(config):
     ):
 
         def get_cli_or_ini(name, default=None):
-            return config.getoption(f"--{name}") or config.getini(name) or default
+            # Unset options are None, False (flags) or an empty string (INI), but 0 is a valid value
+            for value in (config.getoption(f"--{name}"), config.getini(name)):
+                if value is not None and value is not False and value != "":
+                    return value
+            return default
 
         generate_dir = config.getoption("--mpl-generate-path")
         generate_hash_lib = config.getoption("--mpl-generate-hash-library")
@@ -247,6 +494,38 @@ def pytest_configure(config):
             baseline_relative_dir = config.getoption("--mpl-baseline-path")
         else:
             baseline_relative_dir = None
+        race_mirrors = get_cli_or_ini("mpl-race-mirrors")
+        group_by_config = get_cli_or_ini("mpl-group-by-config")
+        sticky_backend = get_cli_or_ini("mpl-sticky-backend")
+        warmup = get_cli_or_ini("mpl-warmup")
+        check_released = get_cli_or_ini("mpl-check-released")
+        check_leaks = None
+        if get_cli_or_ini("mpl-check-leaks"):
+            check_leaks = get_cli_or_ini("mpl-check-leaks-mode", "warn")
+        durations = config.getoption("--mpl-durations")
+        if durations is None and config.getini("mpl-durations"):
+            durations = int(config.getini("mpl-durations"))
+        profile = get_cli_or_ini("mpl-profile")
+        profile_threshold = float(get_cli_or_ini("mpl-profile-threshold", 0))
+        profile_artists = None
+        if get_cli_or_ini("mpl-profile-artists"):
+            profile_artists = int(get_cli_or_ini("mpl-profile-artists-count", 10))
+        track_memory = get_cli_or_ini("mpl-track-memory")
+        trace = get_cli_or_ini("mpl-trace")
+        metrics_file = get_cli_or_ini("mpl-metrics-file")
+        skip_unchanged = get_cli_or_ini("mpl-skip-unchanged")
+        last_failed = config.getoption("--mpl-last-failed")
+        failed_first = config.getoption("--mpl-failed-first")
+        sample = get_cli_or_ini("mpl-sample")
+        if sample is not None:
+            sample = float(sample)
+        sample_seed = str(get_cli_or_ini("mpl-sample-seed", 0))
+        sample_by_module = get_cli_or_ini("mpl-sample-by-module")
+        default_max_render_time = get_cli_or_ini("mpl-default-max-render-time")
+        if default_max_render_time is not None:
+            default_max_render_time = float(default_max_render_time)
+        render_time_factor = float(get_cli_or_ini("mpl-render-time-factor", 1))
+        render_time_mode = get_cli_or_ini("mpl-render-time-mode", "fail")
         use_full_test_name = get_cli_or_ini("mpl-use-full-test-name")
 
         hash_library = get_cli_or_ini("mpl-hash-library")
@@ -284,26 +563,31 @@ def pytest_configure(config):
             if baseline_dir is not None:
                 warnings.warn("Ignoring --mpl-baseline-path since --mpl-generate-path is set")
 
-        if baseline_dir is not None and not baseline_dir.startswith(("https", "http")):
-            baseline_dir = os.path.abspath(baseline_dir)
+        if baseline_dir is not None:
+            baseline_dir = str(resolve_location(baseline_dir, os.getcwd()))
         if generate_dir is not None:
             baseline_dir = os.path.abspath(generate_dir)
         if results_dir is not None:
             results_dir = os.path.abspath(results_dir)
+        if trace is not None:
+            trace = os.path.abspath(trace)
+        if metrics_file is not None:
+            metrics_file = os.path.abspath(metrics_file)
         if hash_library is not None:
             # For backwards compatibility, don't make absolute if set via CLI option
             if not _hash_library_from_cli:
                 hash_library = os.path.abspath(hash_library)
 
+        if warmup and not hasattr(config, "workerinput"):
+            # Workers are started later, so they inherit the font cache location
+            pin_font_cache(config)
+
         if not hasattr(config, "workerinput"):
             uid = uuid.uuid4().hex
             results_dir_path = results_dir or tempfile.mkdtemp()
             config.pytest_mpl_uid = uid
             config.pytest_mpl_results_dir = results_dir_path
 
-        if config.pluginmanager.hasplugin("xdist"):
-            config.pluginmanager.register(XdistPlugin(), name="pytest_mpl_xdist_plugin")
-
         plugin = ImageComparison(
             config,
             baseline_dir=baseline_dir,
@@ -318,14 +602,50 @@ def pytest_configure(config):
             default_tolerance=default_tolerance,
             deterministic=deterministic,
             default_backend=default_backend,
+            race_mirrors=race_mirrors,
+            group_by_config=group_by_config,
+            sticky_backend=sticky_backend,
+            warmup=warmup,
+            check_released=check_released,
+            check_leaks=check_leaks,
+            durations=durations,
+            profile=profile,
+            profile_threshold=profile_threshold,
+            profile_artists=profile_artists,
+            track_memory=track_memory,
+            trace=trace,
+            metrics_file=metrics_file,
+            default_max_render_time=default_max_render_time,
+            render_time_factor=render_time_factor,
+            render_time_mode=render_time_mode,
+            skip_unchanged=skip_unchanged,
+            last_failed=last_failed,
+            failed_first=failed_first,
+            sample=sample,
+            sample_seed=sample_seed,
+            sample_by_module=sample_by_module,
             _hash_library_from_cli=_hash_library_from_cli,
         )
         config.pluginmanager.register(plugin)
 
+        if config.pluginmanager.hasplugin("xdist"):
+            config.pluginmanager.register(XdistPlugin(plugin), name="pytest_mpl_xdist_plugin")
+
     else:
         config.pluginmanager.register(FigureCloser(config))
 
 
+def pytest_unconfigure(config):
+    if hasattr(config, "pytest_mpl_original_mplconfigdir"):
+        # Set by `pin_font_cache`, so that the font cache is shared with the xdist workers
+        original_mplconfigdir = config.pytest_mpl_original_mplconfigdir
+        if original_mplconfigdir is None:
+            os.environ.pop("MPLCONFIGDIR", None)
+        else:
+            os.environ["MPLCONFIGDIR"] = original_mplconfigdir
+        del config.pytest_mpl_original_mplconfigdir
+
+
 @contextlib.contextmanager
 def switch_backend(backend):
     import matplotlib
@@ -339,10 +659,118 @@ def switch_backend(backend):
         yield
 
 
+def _update_rcparams(params):
+    """
+    Update rcParams with already validated values, without validating them again.
+    """
+    import matplotlib
+    if hasattr(matplotlib.rcParams, '_update_raw'):  # matplotlib >= 3.9
+        matplotlib.rcParams._update_raw(params)
+    else:
+        dict.update(matplotlib.rcParams, params)
+
+
+def resolve_style(style):
+    """
+    Return the validated rcParams that ``plt.style.context(style, after_reset=True)`` sets.
+
+    Settings which are not affected by styles (such as the backend) are not included.
+    """
+    import matplotlib
+    import matplotlib.pyplot as plt
+    try:
+        from matplotlib.style import _STYLE_BLACKLIST as STYLE_BLACKLIST
+    except ImportError:
+        from matplotlib.style.core import STYLE_BLACKLIST
+    with plt.style.context(style, after_reset=True):
+        params = dict(matplotlib.rcParams.copy())
+    return {key: value for key, value in params.items() if key not in STYLE_BLACKLIST}
+
+
+@contextlib.contextmanager
+def style_context(style, cache):
+    """
+    Equivalent to ``plt.style.context(style, after_reset=True)``, but each
+    distinct style is only resolved and validated once, and stored in ``cache``.
+    """
+    import matplotlib
+    key = repr(style)
+    if key not in cache:
+        cache[key] = resolve_style(style)
+    orig = dict(matplotlib.rcParams.copy())
+    del orig['backend']
+    try:
+        _update_rcparams(cache[key])
+        yield
+    finally:
+        _update_rcparams(orig)
+
+
+def pin_font_cache(config):
+    """
+    Build the Matplotlib font cache in a directory managed by the plugin.
+
+    The directory is kept in the pytest cache, so that it can be shared
+    between test runs and by all xdist workers. If ``MPLCONFIGDIR`` is
+    already set, or the font cache has already been loaded, Matplotlib's
+    own cache directory is used.
+
+    Matplotlib only has a single setting for its configuration and cache
+    directories, so the user's ``matplotlibrc`` and ``stylelib`` are copied
+    into the directory, where the xdist workers then find them. The previous
+    ``MPLCONFIGDIR`` is restored by `pytest_unconfigure`.
+    """
+    if "MPLCONFIGDIR" not in os.environ and "matplotlib.font_manager" not in sys.modules:
+        import matplotlib
+        if getattr(config, "cache", None) is not None:
+            cache_dir = config.cache.mkdir("mpl-warmup")
+        else:  # cacheprovider plugin is disabled
+            cache_dir = Path(tempfile.gettempdir()) / "pytest-mpl-warmup"
+            cache_dir.mkdir(exist_ok=True)
+        config_dir = Path(matplotlib.get_configdir())
+        for name in ["matplotlibrc", "stylelib"]:
+            # Remove any copy from a previous run, in case the user's own has since been removed
+            if (cache_dir / name).is_dir():
+                shutil.rmtree(cache_dir / name)
+            elif (cache_dir / name).exists():
+                (cache_dir / name).unlink()
+            if (config_dir / name).is_dir():
+                shutil.copytree(config_dir / name, cache_dir / name)
+            elif (config_dir / name).exists():
+                shutil.copyfile(config_dir / name, cache_dir / name)
+        config.pytest_mpl_original_mplconfigdir = os.environ.get("MPLCONFIGDIR")
+        os.environ["MPLCONFIGDIR"] = str(cache_dir)
+    import matplotlib.font_manager  # noqa: F401 (builds or loads the font cache)
+
+
+def get_rss():
+    """
+    Return the resident set size of the process in bytes, or `None` if it
+    is not available on this platform.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def force_exception(result, e):
+    """
+    Make a hook wrapper result raise the given exception.
+    """
+    if hasattr(result, "force_exception"):  # pluggy>=1.2.0
+        result.force_exception(e)
+    else:
+        result._result = None
+        result._excinfo = (type(e), e, e.__traceback__)
+
+
 def close_mpl_figure(fig):
     "Close a given matplotlib Figure. Any other type of figure is ignored"
 
     import matplotlib.pyplot as plt
+    from matplotlib.backend_bases import FigureCanvasBase
     from matplotlib.figure import Figure
 
     # We only need to close actual Matplotlib figure objects. If
@@ -351,6 +779,11 @@ def close_mpl_figure(fig):
     # try closing it here.
     if isinstance(fig, Figure):
         plt.close(fig)
+        # Replace the canvas, so the renderer and its buffers can be freed
+        # even if the figure itself is still referenced
+        FigureCanvasBase(fig)
+        if getattr(fig, '_cachedRenderer', None) is not None:  # matplotlib < 3.6
+            fig._cachedRenderer = None
 
 
 def get_compare(item):
@@ -364,6 +797,135 @@ def path_is_not_none(apath):
     return Path(apath) if apath is not None else apath
 
 
+class MirrorHealth:
+    """
+    Session-wide health and latency tracking for remote baseline mirrors.
+
+    A mirror which fails to respond ``failure_threshold`` times in a row is
+    skipped for ``cooldown`` seconds (a circuit breaker), after which a single
+    attempt is allowed again. Available mirrors are ordered by an exponentially
+    weighted moving average (EWMA) of their response latency, with mirrors
+    that have not yet responded kept in the order they were configured.
+
+    Parameters
+    ----------
+    failure_threshold : int
+        Number of consecutive connection failures before a mirror is skipped.
+    cooldown : float
+        Number of seconds a failed mirror is skipped for.
+    alpha : float
+        Weight of the most recent latency in the moving average.
+    """
+
+    def __init__(self, failure_threshold=MIRROR_FAILURE_THRESHOLD, cooldown=MIRROR_COOLDOWN, alpha=0.3):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.alpha = alpha
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _get(self, url):
+        return self._stats.setdefault(url, {
+            'successes': 0,
+            'misses': 0,
+            'failures': 0,
+            'consecutive_failures': 0,
+            'skipped': 0,
+            'latency': None,
+            'opened_at': None,
+        })
+
+    def _update_latency(self, stats, latency):
+        if stats['latency'] is None:
+            stats['latency'] = latency
+        else:
+            stats['latency'] = self.alpha * latency + (1 - self.alpha) * stats['latency']
+
+    def is_available(self, url):
+        """
+        Whether the circuit breaker currently allows requests to ``url``.
+        """
+        with self._lock:
+            stats = self._get(url)
+            if stats['opened_at'] is None:
+                return True
+            if time.monotonic() - stats['opened_at'] >= self.cooldown:
+                # Half-open: allow one attempt, which re-opens on failure
+                stats['opened_at'] = None
+                stats['consecutive_failures'] = self.failure_threshold - 1
+                return True
+            stats['skipped'] += 1
+            return False
+
+    def order(self, urls):
+        """
+        Return the available mirrors in ``urls``, fastest first.
+        """
+        available = [url for url in urls if self.is_available(url)]
+        with self._lock:
+            def key(url):
+                latency = self._stats[url]['latency']
+                return latency if latency is not None else float('inf')
+            return sorted(available, key=key)  # stable, so configured order breaks ties
+
+    def record_success(self, url, latency):
+        with self._lock:
+            stats = self._get(url)
+            stats['successes'] += 1
+            stats['consecutive_failures'] = 0
+            self._update_latency(stats, latency)
+
+    def record_miss(self, url, latency):
+        """
+        The mirror responded but does not have the requested file.
+        """
+        with self._lock:
+            stats = self._get(url)
+            stats['misses'] += 1
+            stats['consecutive_failures'] = 0
+            self._update_latency(stats, latency)
+
+    def record_failure(self, url):
+        with self._lock:
+            stats = self._get(url)
+            stats['failures'] += 1
+            stats['consecutive_failures'] += 1
+            if stats['consecutive_failures'] >= self.failure_threshold:
+                stats['opened_at'] = time.monotonic()
+
+    def stats(self):
+        """
+        Return a JSON-serializable copy of the per-mirror statistics.
+        """
+        result = {}
+        with self._lock:
+            for url, stats in self._stats.items():
+                result[url] = {k: v for k, v in stats.items() if k != 'opened_at'}
+                result[url]['open'] = stats['opened_at'] is not None
+        return result
+
+    def merge(self, other):
+        """
+        Merge statistics returned by `stats` from another process (e.g. an xdist worker).
+        """
+        with self._lock:
+            for url, other_stats in other.items():
+                stats = self._get(url)
+                responses = stats['successes'] + stats['misses']
+                other_responses = other_stats['successes'] + other_stats['misses']
+                if other_stats['latency'] is not None:
+                    if stats['latency'] is None:
+                        stats['latency'] = other_stats['latency']
+                    else:  # Weight the averages by the number of responses
+                        stats['latency'] = ((stats['latency'] * responses +
+                                             other_stats['latency'] * other_responses) /
+                                            max(responses + other_responses, 1))
+                for k in ['successes', 'misses', 'failures', 'skipped']:
+                    stats[k] += other_stats[k]
+                if other_stats['open'] and stats['opened_at'] is None:
+                    stats['opened_at'] = time.monotonic()
+
+
 class ImageComparison:
     def __init__(
         self,
@@ -380,6 +942,28 @@ class ImageComparison:
         default_tolerance=DEFAULT_TOLERANCE,
         deterministic=None,
         default_backend=DEFAULT_BACKEND,
+        race_mirrors=False,
+        group_by_config=False,
+        sticky_backend=False,
+        warmup=False,
+        check_released=False,
+        check_leaks=None,
+        durations=None,
+        profile=False,
+        profile_threshold=0,
+        profile_artists=None,
+        track_memory=False,
+        trace=None,
+        metrics_file=None,
+        default_max_render_time=None,
+        render_time_factor=1,
+        render_time_mode='fail',
+        skip_unchanged=False,
+        last_failed=False,
+        failed_first=False,
+        sample=None,
+        sample_seed='0',
+        sample_by_module=False,
         _hash_library_from_cli=False,  # for backwards compatibility
     ):
         self.config = config
@@ -407,6 +991,44 @@ class ImageComparison:
         self.default_tolerance = default_tolerance
         self.deterministic = deterministic
         self.default_backend = default_backend
+        self.race_mirrors = race_mirrors
+        self.group_by_config = group_by_config
+        self.sticky_backend = sticky_backend
+        self.warmup = warmup
+        self.check_released = check_released
+        if check_leaks:
+            check_leaks = check_leaks.lower()
+            if check_leaks not in {'warn', 'fail'}:
+                raise ValueError(f"The mpl leak check mode '{check_leaks}' is not supported. "
+                                 "Supported modes are 'warn' and 'fail'.")
+        self.check_leaks = check_leaks
+        self.durations = durations
+        self.profile = profile
+        self.profile_threshold = profile_threshold  # In seconds
+        self.profile_artists = profile_artists  # Number of artist classes to record, or None
+        self.track_memory = track_memory
+        self.trace = trace
+        self.metrics_file = metrics_file
+        self.default_max_render_time = default_max_render_time
+        self.render_time_factor = render_time_factor
+        render_time_mode = render_time_mode.lower()
+        if render_time_mode not in {'fail', 'warn'}:
+            raise ValueError(f"The mpl render time mode '{render_time_mode}' is not supported. "
+                             "Supported modes are 'fail' and 'warn'.")
+        self.render_time_mode = render_time_mode
+        # Fingerprints can only be compared when figures are compared to baselines
+        self.skip_unchanged = skip_unchanged and generate_dir is None and generate_hash_library is None
+        self.last_failed = last_failed
+        self.failed_first = failed_first
+        if sample is not None and not 0 < sample <= 1:
+            raise ValueError(f"The mpl sample fraction '{sample}' is not supported. "
+                             "It should be greater than 0 and at most 1.")
+        # A sample of the tests would write incomplete baselines and hash libraries
+        if generate_dir is not None or generate_hash_library is not None:
+            sample = None
+        self.sample = sample  # Fraction of the figure tests to run, or None to run all
+        self.sample_seed = sample_seed
+        self.sample_by_module = sample_by_module
 
         # Decide what to call the downloadable results hash library
         if self.hash_library is not None:
@@ -418,6 +1040,30 @@ class ImageComparison:
         self._generated_hash_library = {}
         self._test_results = {}
         self._test_stats = None
+        self._mirror_health = MirrorHealth()
+        self._baseline_storages = {}
+        self._prefetched_baselines = {}  # Paths of the prefetched baseline images of each storage
+        self._style_cache = {}
+        self._original_backend = None
+        self._warmup_times = []
+        self._warmup_errors = []
+        self._figure_refs = {}
+        self._timings = None  # Phase timings of the current test
+        self._memory = None  # Memory usage of the current test
+        self._render_time = None  # Render time budget of the current test
+        self._draw_profiler = None  # Artist draw profiler of the current test
+        self._started_tracemalloc = False
+        self._trace_events = []
+        self._manifest_hits = 0
+        self._fingerprinter = None
+        self._passed_fingerprints = {}  # Fingerprints of the tests which passed in previous runs
+        self._fingerprints = {}  # Fingerprints of the tests of this run, or None if not passed
+        self._hash_libraries = {}
+        self._last_outcomes = {}  # Outcomes of the figure tests the last time they were run
+        self._collected_tests = {}  # Modules of the figure tests collected in this session, by name
+        self._last_failed_message = None
+        self._sample_message = None
+        self._worker_collection_messages = []  # Messages of the xdist workers, shown by the controller
         self.return_value = {}
 
     def pytest_sessionstart(self, session):
@@ -428,6 +1074,295 @@ class ImageComparison:
         self.results_dir = Path(config.pytest_mpl_results_dir)
         self.results_dir.mkdir(parents=True, exist_ok=True)
 
+        is_xdist_controller = (
+            config.pluginmanager.hasplugin("xdist")
+            and not hasattr(config, "workerinput")
+            and getattr(config.option, "dist", "no") != "no"
+        )
+        if self.skip_unchanged:
+            self._fingerprinter = CodeFingerprinter(config.rootdir)
+            if getattr(config, "cache", None) is not None:
+                self._passed_fingerprints = config.cache.get(SKIP_UNCHANGED_CACHE_KEY, {})
+        if (self.last_failed or self.failed_first) and getattr(config, "cache", None) is not None:
+            self._last_outcomes = config.cache.get(LAST_OUTCOMES_CACHE_KEY, {})
+        if self.track_memory and not is_xdist_controller and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def pytest_collection_finish(self, session):
+        # The xdist controller doesn't collect tests, so this only runs where tests are run
+        if self.warmup:
+            self._warmup_times.append(self.warm_up(session.items))
+
+    def warm_up(self, items):
+        """
+        Render a figure with each style and backend used by the figure tests
+        in ``items``, so that fonts, mathtext, the styles and the backends are
+        loaded before the first test.
+
+        Returns the time taken in seconds.
+        """
+        import matplotlib.pyplot as plt
+        start = time.perf_counter()
+        configs = {}
+        for kwargs in [{}] + [compare.kwargs for compare in map(get_compare, items) if compare is not None]:
+            backend = kwargs.get('backend', self.default_backend)
+            style = kwargs.get('style', self.default_style)
+            configs.setdefault((backend.lower(), repr(style)), (backend, style))
+        for backend, style in configs.values():
+            try:
+                with style_context(style, self._style_cache), switch_backend(backend):
+                    fig, ax = plt.subplots()
+                    try:
+                        ax.plot([1, 2, 3], label="line")
+                        ax.set_title(r"Warm-up $\alpha^2 + \sqrt{x}$")
+                        ax.legend()
+                        fig.savefig(io.BytesIO(), format="png")
+                    finally:
+                        plt.close(fig)
+            except Exception as e:  # The tests will report any real problem
+                self._warmup_errors.append(str(e))
+        return time.perf_counter() - start
+
+    def pytest_report_header(self):
+        if self.sample is not None:
+            by_module = ", by module" if self.sample_by_module else ""
+            return f"mpl-sample: {self.sample:.0%} of figure tests (seed {self.sample_seed}{by_module})"
+
+    def get_figure_config(self, item):
+        """
+        Return the (backend, style, format) that the figure test will use.
+        """
+        compare = get_compare(item)
+        backend = compare.kwargs.get('backend', self.default_backend)
+        style = compare.kwargs.get('style', self.default_style)
+        return backend.lower(), repr(style), self._file_extension(item)
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_collection_modifyitems(self, config, items):
+        # Remember every collected figure test, before any are deselected
+        for item in items:
+            if get_compare(item) is not None:
+                self._collected_tests[generate_test_name(item)] = item.module.__name__
+        if self.sample is not None:
+            self.select_sample(config, items)
+        if self.group_by_config:
+            self.group_items(items)
+        if self.last_failed or self.failed_first:
+            self.select_last_failed(config, items)
+
+    def group_items(self, items):
+        """
+        Group figure tests by backend, style and format.
+
+        Only consecutive items with the same parent (module or class) are
+        reordered, so the setup and teardown of module and class scoped
+        fixtures is unchanged. Unmarked tests are kept first, in their
+        original order.
+        """
+        def sort_key(item):
+            if get_compare(item) is None:
+                return ()
+            return self.get_figure_config(item)
+
+        reordered = []
+        for _, group in itertools.groupby(items, key=lambda item: item.parent):
+            reordered.extend(sorted(group, key=sort_key))
+        items[:] = reordered
+
+        # Hint to `pytest -n <N> --dist loadgroup` to keep each group on the same worker
+        for item in items:
+            if get_compare(item) is None or item.get_closest_marker("xdist_group") is not None:
+                continue
+            module_id = item.nodeid.split("::")[0]
+            group_name = ":".join(("mpl", module_id) + self.get_figure_config(item))
+            item.add_marker(pytest.mark.xdist_group(name=group_name))
+
+    def sample_key(self, item):
+        """
+        Return a number in [0, 1) for the figure test, which is the same in
+        every session with the same seed.
+        """
+        digest = hashlib.sha256(f"{self.sample_seed}:{generate_test_name(item)}".encode()).digest()
+        return int.from_bytes(digest[:8], "big") / 2 ** 64
+
+    def select_sample(self, config, items):
+        """
+        Select a sample of ``--mpl-sample`` of the figure tests, and deselect
+        the others. Unmarked tests are always selected.
+
+        A test is selected when its key is below the fraction, so whether it is
+        selected does not depend on the other tests. With
+        ``--mpl-sample-by-module``, the fraction of the tests of each module
+        with the lowest keys are selected instead, rounded up so that at least
+        one test of each module is run.
+        """
+        marked = [item for item in items if get_compare(item) is not None]
+        if self.sample_by_module:
+            modules = {}
+            for item in marked:
+                modules.setdefault(item.nodeid.split("::")[0], []).append(item)
+            selected = set()
+            for module_items in modules.values():
+                n_selected = math.ceil(self.sample * len(module_items))
+                selected.update(sorted(module_items, key=self.sample_key)[:n_selected])
+        else:
+            selected = {item for item in marked if self.sample_key(item) < self.sample}
+
+        deselected = [item for item in marked if item not in selected]
+        if deselected:
+            items[:] = [item for item in items if get_compare(item) is None or item in selected]
+            config.hook.pytest_deselected(items=deselected)
+        self._sample_message = (f"mpl-sample: selected {len(selected)} of {len(marked)} figure tests "
+                                f"(deselected {len(deselected)} items).")
+
+    def select_last_failed(self, config, items):
+        """
+        Select only (``--mpl-last-failed``), or move to the front
+        (``--mpl-failed-first``), the figure tests which failed the last time
+        they were run.
+        """
+        def failed(item):
+            outcome = self._last_outcomes.get(generate_test_name(item))
+            return get_compare(item) is not None and outcome is not None and failed_outcome(outcome)
+
+        failed_items = [item for item in items if failed(item)]
+        if not failed_items:
+            option = "mpl-last-failed" if self.last_failed else "mpl-failed-first"
+            self._last_failed_message = f"{option}: no previously failed figure tests, not deselecting items."
+            return
+        other_items = [item for item in items if not failed(item)]
+        if self.last_failed:
+            # Like --mpl-sample, only deselect figure tests
+            deselected = [item for item in other_items if get_compare(item) is not None]
+            items[:] = [item for item in items if failed(item) or get_compare(item) is None]
+            config.hook.pytest_deselected(items=deselected)
+            self._last_failed_message = (f"mpl-last-failed: rerun {len(failed_items)} previously failed "
+                                         f"figure tests (deselected {len(deselected)} items).")
+        else:
+            items[:] = failed_items + other_items
+            self._last_failed_message = (f"mpl-failed-first: run {len(failed_items)} previously failed "
+                                         "figure tests first.")
+
+    def collection_messages(self):
+        """
+        Return the lines describing which figure tests were selected.
+        """
+        return [message for message in (self._sample_message, self._last_failed_message) if message is not None]
+
+    def pytest_report_collectionfinish(self, config, items):
+        return self.collection_messages()
+
+    def activate_backend(self, backend):
+        """
+        Switch to the given backend and leave it active (``--mpl-sticky-backend``).
+        """
+        import matplotlib
+        import matplotlib.pyplot as plt
+        current_backend = matplotlib.get_backend().lower()
+        if self._original_backend is None:
+            self._original_backend = current_backend
+        if current_backend != backend.lower():
+            plt.switch_backend(backend)
+
+    def restore_backend(self):
+        """
+        Switch back to the backend which was active before ``activate_backend``.
+        """
+        if self._original_backend is None:
+            return
+        import matplotlib
+        import matplotlib.pyplot as plt
+        if matplotlib.get_backend().lower() != self._original_backend:
+            plt.switch_backend(self._original_backend)
+        self._original_backend = None
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self, item):
+        if get_compare(item) is None:
+            self.restore_backend()
+
+    @contextlib.contextmanager
+    def timer(self, phase):
+        """
+        Add the time taken by the block to a phase of the current figure test.
+        """
+        start = time.perf_counter()
+        try:
+            with self.memory_tracker(phase), self.trace_span(phase, 'phase'):
+                yield
+        finally:
+            if self._timings is not None:
+                self._timings[phase] += time.perf_counter() - start
+
+    @contextlib.contextmanager
+    def trace_span(self, name, category, **args):
+        """
+        Add the block to the ``--mpl-trace`` timeline.
+        """
+        if self.trace is None:
+            yield
+            return
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.add_trace_event(name, category, start, **args)
+
+    def add_trace_event(self, name, category, start, **args):
+        """
+        Add a complete event, from ``start`` (as returned by `time.time`) until now,
+        to the ``--mpl-trace`` timeline.
+        """
+        self._trace_events.append({
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': start * 1e6,
+            'dur': (time.time() - start) * 1e6,
+            'pid': os.getpid(),
+            'tid': threading.get_native_id(),
+            'args': args,
+        })
+
+    def add_trace_process_name(self, name):
+        """
+        Label the lane of this process in the ``--mpl-trace`` timeline.
+        """
+        self._trace_events.append({
+            'name': 'process_name',
+            'ph': 'M',
+            'pid': os.getpid(),
+            'args': {'name': name},
+        })
+
+    def write_trace(self):
+        with open(self.trace, 'w') as f:
+            json.dump({'traceEvents': self._trace_events, 'displayTimeUnit': 'ms'}, f)
+        return self.trace
+
+    @contextlib.contextmanager
+    def memory_tracker(self, phase):
+        """
+        Add the peak memory allocated by the block, and the change in resident
+        memory, to the memory usage of the current figure test.
+        """
+        memory_phase = next((k for k, v in MEMORY_PHASES.items() if phase in v), None)
+        if self._memory is None or memory_phase is None:
+            yield
+            return
+        rss_start = get_rss()
+        traced_start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            _, traced_peak = tracemalloc.get_traced_memory()
+            usage = self._memory[memory_phase]
+            usage['peak'] = max(usage['peak'], traced_peak - traced_start)
+            if rss_start is not None:
+                usage['rss_delta'] += get_rss() - rss_start
+
     def get_logger(self):
         # configure a separate logger for this pluggin which is independent
         # of the options that are configured for pytest or for the code that
@@ -475,7 +1410,8 @@ class ImageComparison:
         """
         test_name = pathify(generate_test_name(item))
         results_dir = self.results_dir / test_name
-        results_dir.mkdir(exist_ok=True, parents=True)
+        with self.timer('artifacts'):
+            results_dir.mkdir(exist_ok=True, parents=True)
         return results_dir
 
     def baseline_directory_specified(self, item):
@@ -506,52 +1442,159 @@ class ImageComparison:
                     # baseline dir is relative to where pytest was run
                     baseline_dir = self.baseline_dir
 
-        baseline_remote = (isinstance(baseline_dir, str) and  # noqa
-                           baseline_dir.startswith(('http://', 'https://')))
-        if not baseline_remote:
-            return _get_item_dir(item) / baseline_dir
+        return resolve_location(baseline_dir, _get_item_dir(item))
 
-        return baseline_dir
+    def get_baseline_storage(self, item):
+        """
+        Return the storage backend for the baseline directory of this test.
 
-    def _download_file(self, baseline, filename):
-        # Note that baseline can be a comma-separated list of URLs that we can
-        # then treat as mirrors
-        for base_url in baseline.split(','):
-            try:
-                u = urlopen(base_url + filename)
+        Backends are created once per baseline location and reused for the
+        whole session.
+        """
+        location = self.get_baseline_directory(item)
+        key = str(location)
+        if key not in self._baseline_storages:
+            self._baseline_storages[key] = get_storage_backend(location)(location, self)
+        return self._baseline_storages[key]
+
+    def _fetch_from_mirror(self, base_url, filename, digest=None):
+        """
+        Download ``filename`` from a single mirror, recording the mirror health.
+
+        If ``digest`` is given, content whose SHA-256 does not match is discarded.
+        """
+        start = time.monotonic()
+        try:
+            with urlopen(base_url + filename) as u:
                 content = u.read()
-            except Exception as e:
-                self.get_logger().info(f'Downloading {base_url + filename} failed: {repr(e)}')
+        except HTTPError as e:
+            # The mirror responded, so only a server error counts against its health
+            if e.code >= 500:
+                self._mirror_health.record_failure(base_url)
             else:
+                self._mirror_health.record_miss(base_url, time.monotonic() - start)
+            self.get_logger().info(f'Downloading {base_url + filename} failed: {repr(e)}')
+        except Exception as e:
+            self._mirror_health.record_failure(base_url)
+            self.get_logger().info(f'Downloading {base_url + filename} failed: {repr(e)}')
+        else:
+            if digest is not None and hashlib.sha256(content).hexdigest() != digest:
+                # The mirror responded, but with a different version of the file
+                self._mirror_health.record_miss(base_url, time.monotonic() - start)
+                self.get_logger().info(f'Downloading {base_url + filename} failed: '
+                                       'SHA-256 does not match the baseline manifest')
+                return
+            self._mirror_health.record_success(base_url, time.monotonic() - start)
+            return content
+
+    def _race_mirrors(self, base_urls, filename, digest=None):
+        """
+        Download ``filename`` from several mirrors at once and return the first
+        successful response.
+        """
+        executor = ThreadPoolExecutor(max_workers=len(base_urls))
+        try:
+            futures = [executor.submit(self._fetch_from_mirror, base_url, filename, digest)
+                       for base_url in base_urls]
+            for future in as_completed(futures):
+                content = future.result()
+                if content is not None:
+                    return content
+        finally:
+            # Don't wait for the slower mirror; it still records its health when done
+            executor.shutdown(wait=False)
+
+    def _download_content(self, baseline, filename, digest=None):
+        # Note that baseline can be a comma-separated list of URLs that we can
+        # then treat as mirrors. Mirrors which are down are skipped and the
+        # remaining ones are tried fastest first.
+        base_urls = self._mirror_health.order(baseline.split(','))
+        content = None
+        if self.race_mirrors and len(base_urls) > 1:
+            content = self._race_mirrors(base_urls[:2], filename, digest)
+            base_urls = base_urls[2:]
+        for base_url in base_urls:
+            if content is not None:
                 break
-        else:  # Could not download baseline image from any of the available URLs
+            content = self._fetch_from_mirror(base_url, filename, digest)
+        return content
+
+    def _download_file(self, baseline, filename, digest=None):
+        content = self._download_content(baseline, filename, digest)
+        if content is None:  # Could not download baseline image from any of the available URLs
             return
-        result_dir = Path(tempfile.mkdtemp())
-        filename = result_dir / 'downloaded'
-        with open(str(filename), 'wb') as tmpfile:
-            tmpfile.write(content)
-        return Path(filename)
+        return write_temporary(content)
+
+    @property
+    def _archive_cache_dir(self):
+        # Keyed by the session uid so that it is shared by all the xdist workers
+        return Path(tempfile.gettempdir()) / f"pytest-mpl-archives-{self.config.pytest_mpl_uid}"
+
+    def get_manifest_entry(self, item):
+        """
+        Return the baseline manifest entry for the baseline image, if any.
+
+        See `pytest_mpl.storage.BaselineStorage.manifest_entry`.
+        """
+        return self.get_baseline_storage(item).manifest_entry(self.generate_filename(item))
 
     def obtain_baseline_image(self, item):
         """
         Copy the baseline image to our working directory.
 
         If the image is remote it is downloaded, if it is local it is copied to
-        ensure it is kept in the event of a test failure.
+        ensure it is kept in the event of a test failure. Returns `None` if the
+        baseline image is not available.
         """
         filename = self.generate_filename(item)
-        baseline_dir = self.get_baseline_directory(item)
-        baseline_remote = (isinstance(baseline_dir, str) and  # noqa
-                           baseline_dir.startswith(('http://', 'https://')))
-        if baseline_remote:
-            # baseline_dir can be a list of URLs when remote, so we have to
-            # pass base and filename to download
-            baseline_image = self._download_file(baseline_dir, filename)
-        else:
-            baseline_image = (baseline_dir / filename).absolute()
-
+        storage = self.get_baseline_storage(item)
+        with self.timer('baseline_fetch'):
+            if storage.prefetch:
+                key = str(storage.location)
+                if key not in self._prefetched_baselines:
+                    self._prefetched_baselines[key] = self.prefetch_baseline_images(item.session.items, storage)
+                if filename in self._prefetched_baselines[key]:
+                    return self._prefetched_baselines[key][filename]
+            baseline_image, = storage.get([filename])
         return baseline_image
 
+    def prefetch_baseline_images(self, items, storage):
+        """
+        Fetch the baseline images of all the figure tests in ``items`` which use
+        ``storage`` with a single call to its batch `get` operation.
+
+        Images which are only needed if the figure differs from its hash in a
+        hash library or baseline manifest are not prefetched. The images are
+        fetched into a directory shared by the xdist workers, so that only one
+        worker fetches them. Returns a dictionary mapping the filenames of the
+        images to their paths, or `None` where they are not available.
+        """
+        filenames = []
+        for item in items:
+            if get_compare(item) is None or self.uses_hash_library(item):
+                continue
+            if self.get_baseline_storage(item) is not storage:
+                continue
+            filename = self.generate_filename(item)
+            if filename not in filenames and not (storage.manifest_entry(filename) or {}).get('sha256'):
+                filenames.append(filename)
+        if not filenames:
+            return {}
+
+        def fetch(tmp_path):
+            tmp_path.mkdir(parents=True)
+            for filename, path in zip(filenames, storage.get(filenames)):
+                if path is not None:
+                    shutil.copyfile(path, tmp_path / filename)
+
+        key = hashlib.sha256(str(storage.location).encode()).hexdigest()
+        prefetch_dir = self._archive_cache_dir / f"{key}-baseline"
+        prefetch_dir.parent.mkdir(parents=True, exist_ok=True)
+        if not create_once(prefetch_dir, fetch):
+            return {}
+        return {filename: (prefetch_dir / filename).absolute() if (prefetch_dir / filename).exists() else None
+                for filename in filenames}
+
     def generate_baseline_image(self, item, fig):
         """
         Generate reference figures.
@@ -575,7 +1618,8 @@ class ImageComparison:
 
         imgdata = io.BytesIO()
         self.save_figure(item, fig, imgdata)
-        out = _hash_file(imgdata)
+        with self.timer('hash'):
+            out = _hash_file(imgdata)
         imgdata.close()
 
         close_mpl_figure(fig)
@@ -604,15 +1648,31 @@ class ImageComparison:
         else:
             summary['result_image'] = (result_dir / f"result_{ext}.png").relative_to(self.results_dir).as_posix()
 
+        # Skip downloading the baseline if it is identical to the result. This is not
+        # done if a PNG version of a vector image is needed for the results.
+        with self.timer('baseline_fetch'):
+            manifest_entry = self.get_manifest_entry(item) or {}
+        if manifest_entry.get('sha256') and (not self.results_always or ext in ['png', 'svg']):
+            with self.timer('hash'), open(test_image, 'rb') as f:
+                identical = _hash_file(f) == manifest_entry['sha256']
+            if identical:
+                self._manifest_hits += 1
+                if self.results_always:
+                    baseline_image = (result_dir / f"baseline.{ext}").absolute()
+                    with self.timer('artifacts'):
+                        shutil.copyfile(test_image, baseline_image)
+                    summary['baseline_image'] = baseline_image.relative_to(self.results_dir).as_posix()
+                summary['tolerance'] = tolerance
+                summary['status'] = 'passed'
+                summary['image_status'] = 'match'
+                summary['status_msg'] = 'Image comparison passed (identical to the baseline manifest digest).'
+                return None
+
         baseline_image_ref = self.obtain_baseline_image(item)
 
         baseline_missing = None
-        if baseline_image_ref is None:
-            baseline_missing = ("Could not download the baseline image from "
-                                "any of the available URLs.\n")
-        elif not os.path.exists(baseline_image_ref):
-            baseline_missing = ("Image file not found for comparison test in: \n\t"
-                                f"{self.get_baseline_directory(item)}\n")
+        if baseline_image_ref is None or not os.path.exists(baseline_image_ref):
+            baseline_missing = self.get_baseline_storage(item).missing_message()
 
         if baseline_missing:
             summary['status'] = 'failed'
@@ -627,7 +1687,8 @@ class ImageComparison:
         # setuptools may put the baseline images in non-accessible places,
         # copy to our tmpdir to be sure to keep them in case of failure
         baseline_image = (result_dir / f"baseline.{ext}").absolute()
-        shutil.copyfile(baseline_image_ref, baseline_image)
+        with self.timer('artifacts'):
+            shutil.copyfile(baseline_image_ref, baseline_image)
 
         if ext in ['png', 'svg']:  # Use original file
             summary['baseline_image'] = baseline_image.relative_to(self.results_dir).as_posix()
@@ -639,8 +1700,12 @@ class ImageComparison:
         # the filenames. However imread won't work for vector graphics so we
         # only do this for raster files.
         if ext in RASTER_IMAGE_FORMATS:
-            expected_shape = imread(str(baseline_image)).shape[:2]
-            actual_shape = imread(str(test_image)).shape[:2]
+            with self.timer('compare'):
+                if manifest_entry.get('shape'):
+                    expected_shape = tuple(manifest_entry['shape'][:2])
+                else:
+                    expected_shape = imread(str(baseline_image)).shape[:2]
+                actual_shape = imread(str(test_image)).shape[:2]
             if expected_shape != actual_shape:
                 summary['status'] = 'failed'
                 summary['image_status'] = 'diff'
@@ -651,7 +1716,8 @@ class ImageComparison:
                 summary['status_msg'] = error_message
                 return error_message
 
-        results = compare_images(str(baseline_image), str(test_image), tol=tolerance, in_decorator=True)
+        with self.timer('compare'):
+            results = compare_images(str(baseline_image), str(test_image), tol=tolerance, in_decorator=True)
 
         summary['tolerance'] = tolerance
         if results is None:
@@ -662,7 +1728,7 @@ class ImageComparison:
         else:
             summary['status'] = 'failed'
             summary['image_status'] = 'diff'
-            summary['rms'] = results['rms']
+            summary['rms'] = float(results['rms'])
             summary['diff_image'] = Path(results['diff']).relative_to(self.results_dir).as_posix()
             template = ['Error: Image files did not match.',
                         'RMS Value: {rms}',
@@ -674,10 +1740,97 @@ class ImageComparison:
             summary['status_msg'] = error_message
             return error_message
 
+    def get_hash_library_path(self, item):
+        """
+        Return the path to the hash library of a figure test.
+        """
+        compare = get_compare(item)
+        # Order of precedence for hash library: CLI, kwargs, INI (for backwards compatibility)
+        hash_library_filename = compare.kwargs.get("hash_library", None) or self.hash_library
+        if self._hash_library_from_cli:  # for backwards compatibility
+            hash_library_filename = self.hash_library
+        return _get_item_dir(item) / hash_library_filename
+
+    def uses_hash_library(self, item):
+        """
+        Whether the figure of a test is compared to a hash library.
+        """
+        compare = get_compare(item)
+        use_hash_library = self.hash_library or compare.kwargs.get('hash_library', None)
+        return bool(use_hash_library) and not compare.kwargs.get('skip_hash', False)
+
     def load_hash_library(self, library_path):
         with open(str(library_path)) as fp:
             return json.load(fp)
 
+    def get_fingerprint(self, item):
+        """
+        Return the fingerprint of everything which determines the result of a
+        figure test, or `None` if it can't be computed.
+
+        This includes the code of the test function and its fixtures (see
+        `pytest_mpl.fingerprint`), the marker, the baseline and the versions
+        of matplotlib, freetype and pytest-mpl.
+        """
+        import matplotlib
+        from matplotlib import ft2font
+
+        compare = get_compare(item)
+        parts = [
+            matplotlib.__version__,
+            ft2font.__freetype_version__,
+            __version__,
+            repr(compare.args),
+            repr(sorted(compare.kwargs.items())),
+            repr([self.default_style, self.default_tolerance, self.default_backend,
+                  self.deterministic, self.results_always]),
+        ]
+        callspec = getattr(item, 'callspec', None)
+        if callspec is not None:
+            parts.append(self._fingerprinter.params_digest(callspec.params, item.module))
+
+        functions = [item.function]
+        fixtureinfo = getattr(item, '_fixtureinfo', None)
+        if fixtureinfo is not None:
+            for name in fixtureinfo.names_closure:
+                fixturedefs = fixtureinfo.name2fixturedefs.get(name)
+                if fixturedefs:
+                    functions.append(fixturedefs[-1].func)
+        for function in functions:
+            parts.append(self._fingerprinter.digest(function))
+
+        parts.append(self.get_baseline_digest(item))
+        if None in parts:
+            return None
+        return hashlib.sha256('\n'.join(parts).encode()).hexdigest()
+
+    def get_baseline_digest(self, item):
+        """
+        Return a digest of the baseline hash and image of a figure test, or
+        `None` if the baseline image would need to be downloaded.
+        """
+        compare = get_compare(item)
+        parts = []
+        skip_hash = compare.kwargs.get('skip_hash', False)
+        use_hash_library = (self.hash_library or compare.kwargs.get('hash_library', None)) and not skip_hash
+        if use_hash_library:
+            library_path = self.get_hash_library_path(item)
+            if library_path not in self._hash_libraries:
+                self._hash_libraries[library_path] = \
+                    self.load_hash_library(library_path) if library_path.exists() else {}
+            parts.append(str(self._hash_libraries[library_path].get(generate_test_name(item))))
+        if not use_hash_library or self.baseline_directory_specified(item):
+            manifest_entry = self.get_manifest_entry(item) or {}
+            if manifest_entry.get('sha256'):
+                parts.append(manifest_entry['sha256'])
+            else:
+                storage = self.get_baseline_storage(item)
+                if not isinstance(storage, FileSystemStorage):
+                    return None
+                content = storage.read(self.generate_filename(item))
+                parts.append('missing' if content is None else hashlib.sha256(content).hexdigest())
+        return '\n'.join(parts)
+
     def save_figure(self, item, fig, filename):
         if isinstance(filename, Path):
             filename = str(filename)
@@ -747,13 +1900,61 @@ class ImageComparison:
             savefig_kwargs['metadata'].update(extra_metadata)
 
         import matplotlib.pyplot as plt
+        from matplotlib.figure import Figure
+        if self._draw_profiler is not None and isinstance(fig, Figure):
+            draw_profile = self._draw_profiler.profile(fig)
+        else:
+            draw_profile = contextlib.nullcontext()
+
+        # Render into memory if a plugin wants the image data, so that the file isn't read back
+        rendered_hook = item.config.hook.pytest_mpl_figure_rendered
+        target = filename
+        if rendered_hook.get_hookimpls() and isinstance(filename, str):
+            target = io.BytesIO()
+            savefig_kwargs = {'format': ext, **savefig_kwargs}
 
-        with plt.rc_context(rc=extra_rcparams):
-            fig.savefig(filename, **savefig_kwargs)
+        with plt.rc_context(rc=extra_rcparams), self.timer('savefig'), draw_profile:
+            start = time.perf_counter()
+            fig.savefig(target, **savefig_kwargs)
+            render_time = time.perf_counter() - start
 
         if original_source_date_epoch is not None:
             os.environ['SOURCE_DATE_EPOCH'] = original_source_date_epoch
 
+        if rendered_hook.get_hookimpls():
+            data = target.getvalue()
+            if target is not filename:
+                with self.timer('artifacts'), open(filename, 'wb') as f:
+                    f.write(data)
+            rendered_hook(item=item, fig=fig, data=data)
+
+        self.check_render_time(item, render_time)
+
+    def check_render_time(self, item, render_time):
+        """
+        Check the time taken to save the figure against the render time
+        budget of the current test.
+
+        The slowest save is recorded in the summary. In ``warn`` mode a
+        warning is emitted straight away, otherwise the test is failed once
+        the figure has been compared.
+        """
+        if self._render_time is None:
+            return
+        budget = self._render_time
+        budget['time'] = max(budget['time'], render_time)
+        if render_time <= budget['budget'] or budget['status'] == 'exceeded':
+            return
+        budget['status'] = 'exceeded'
+        if self.render_time_mode == 'warn':
+            warnings.warn(self.render_time_message(item))
+
+    def render_time_message(self, item):
+        budget = self._render_time
+        return (f"Error: Saving the figure of {generate_test_name(item)} took longer than its budget.\n"
+                f"  Render time: {budget['time']:.3f}s\n"
+                f"  Budget: {budget['budget']:.3f}s")
+
     def compare_image_to_hash_library(self, item, fig, result_dir, summary=None):
         hash_comparison_pass = False
         if summary is None:
@@ -767,16 +1968,13 @@ class ImageComparison:
             # Use hash library name of current test as results hash library name
             self.results_hash_library_name = Path(compare.kwargs.get("hash_library", "")).name
 
-        # Order of precedence for hash library: CLI, kwargs, INI (for backwards compatibility)
-        hash_library_filename = compare.kwargs.get("hash_library", None) or self.hash_library
-        if self._hash_library_from_cli:  # for backwards compatibility
-            hash_library_filename = self.hash_library
-        hash_library_filename = _get_item_dir(item) / hash_library_filename
+        hash_library_filename = self.get_hash_library_path(item)
 
         if not Path(hash_library_filename).exists():
             pytest.fail(f"Can't find hash library at path {hash_library_filename}")
 
-        hash_library = self.load_hash_library(hash_library_filename)
+        with self.timer('baseline_fetch'):
+            hash_library = self.load_hash_library(hash_library_filename)
         hash_name = generate_test_name(item)
         baseline_hash = hash_library.get(hash_name, None)
         summary['baseline_hash'] = baseline_hash
@@ -836,6 +2034,43 @@ class ImageComparison:
             return
         return summary['status_msg']
 
+    def new_summary(self, item):
+        """
+        Return the summary of a figure test before it has run, which is the
+        one reported if an exception is raised.
+        """
+        compare = get_compare(item)
+        summary = {
+            'status': 'failed',
+            'image_status': None,
+            'hash_status': None,
+            'status_msg': 'An exception was raised while testing the figure.',
+            'baseline_image': None,
+            'diff_image': None,
+            'rms': None,
+            'tolerance': None,
+            'result_image': None,
+            'baseline_hash': None,
+            'result_hash': None,
+            'timings': {phase: 0.0 for phase in TIMING_PHASES},
+        }
+        if self.profile:
+            summary['profile'] = None
+        if self.profile_artists is not None:
+            summary['artists'] = None
+        if self.track_memory:
+            summary['memory'] = {phase: {'peak': 0, 'rss_delta': 0} for phase in MEMORY_PHASES}
+            summary['max_memory'] = compare.kwargs.get('max_memory')
+        max_render_time = compare.kwargs.get('max_render_time', self.default_max_render_time)
+        # Timing the draw of every artist slows down savefig, so budgets aren't checked while profiling
+        if max_render_time is not None and self.generate_dir is None and self.profile_artists is None:
+            summary['render_time'] = {
+                'time': 0.0,
+                'budget': max_render_time * self.render_time_factor,
+                'status': 'within',
+            }
+        return summary
+
     @pytest.hookimpl(hookwrapper=True)
     def pytest_runtest_call(self, item):  # noqa
 
@@ -845,7 +2080,6 @@ class ImageComparison:
             yield
             return
 
-        import matplotlib.pyplot as plt
         try:
             from matplotlib.testing.decorators import remove_ticks_and_titles
         except ImportError:
@@ -858,32 +2092,53 @@ class ImageComparison:
 
         ext = self._file_extension(item)
 
-        with plt.style.context(style, after_reset=True), switch_backend(backend):
+        if self.sticky_backend:
+            self.activate_backend(backend)
+            backend_context = contextlib.nullcontext()
+        else:
+            backend_context = switch_backend(backend)
+
+        trace_start = time.time()
+
+        with style_context(style, self._style_cache), backend_context:
 
             test_name = generate_test_name(item)
 
             # Store fallback summary in case of exceptions
-            summary = {
-                'status': 'failed',
-                'image_status': None,
-                'hash_status': None,
-                'status_msg': 'An exception was raised while testing the figure.',
-                'baseline_image': None,
-                'diff_image': None,
-                'rms': None,
-                'tolerance': None,
-                'result_image': None,
-                'baseline_hash': None,
-                'result_hash': None,
-            }
+            summary = self.new_summary(item)
+            if self.profile_artists is not None:
+                self._draw_profiler = DrawProfiler()
+            if self.skip_unchanged:
+                fingerprint = self.get_fingerprint(item)
+                self._fingerprints[item.nodeid] = fingerprint
+                summary['cached'] = (fingerprint is not None
+                                     and self._passed_fingerprints.get(item.nodeid) == fingerprint)
             self._test_results[test_name] = summary
+            self._timings = summary['timings']
+            self._memory = summary.get('memory')
+            self._render_time = summary.get('render_time')
+
+            if self.check_leaks:
+                import matplotlib.pyplot as plt
+                open_figures = set(plt.get_fignums())
 
             # Run test and get figure object
             wrap_figure_interceptor(self, item)
 
+            profiler = self.start_profiler()
+
             # See https://github.com/pytest-dev/pytest/issues/11714
-            result = yield
+            start = time.perf_counter()
+            with self.memory_tracker('test'), self.trace_span('test', 'phase'):
+                result = yield
+            self._timings['test'] = time.perf_counter() - start
+            fig = None
             try:
+                if summary.get('cached'):
+                    summary['status'] = 'passed'
+                    summary['status_msg'] = ('Skipped the comparison, since the test is unchanged '
+                                             'since it last passed.')
+                    return
                 if test_name not in self.return_value:
                     # Test function did not complete successfully
                     summary['status'] = 'failed'
@@ -891,10 +2146,16 @@ class ImageComparison:
                                              'before returning a figure.')
                     self._test_results[test_name] = summary
                     return
-                fig = self.return_value[test_name]
+                fig = self.return_value.pop(test_name)
+                if self.check_released:
+                    try:
+                        self._figure_refs[item.nodeid] = weakref.ref(fig)
+                    except TypeError:  # Not a Matplotlib figure
+                        pass
 
                 if remove_text:
-                    remove_ticks_and_titles(fig)
+                    with self.timer('remove_text'):
+                        remove_ticks_and_titles(fig)
 
                 result_dir = self.make_test_results_dir(item)
 
@@ -907,7 +2168,8 @@ class ImageComparison:
                     generate_image = self.generate_baseline_image(item, fig)
                     if self.results_always:  # Make baseline image available in HTML
                         result_image = (result_dir / f"baseline.{ext}").absolute()
-                        shutil.copy(generate_image, result_image)
+                        with self.timer('artifacts'):
+                            shutil.copy(generate_image, result_image)
                         summary['baseline_image'] = \
                             result_image.relative_to(self.results_dir).as_posix()
 
@@ -924,91 +2186,289 @@ class ImageComparison:
                 # Only test figures if not generating images
                 if self.generate_dir is None:
                     # Compare to hash library (skip_hash=True disables for this test)
-                    skip_hash = compare.kwargs.get('skip_hash', False)
-                    use_hash_library = (self.hash_library or compare.kwargs.get('hash_library', None)) and not skip_hash
-                    if use_hash_library:
+                    if self.uses_hash_library(item):
                         msg = self.compare_image_to_hash_library(item, fig, result_dir, summary=summary)
 
                     # Compare against a baseline if specified
                     else:
                         msg = self.compare_image_to_baseline(item, fig, result_dir, summary=summary)
 
-                    close_mpl_figure(fig)
+                    if 'missing' in (summary['image_status'], summary['hash_status']):
+                        item.config.hook.pytest_mpl_baseline_missing(item=item)
 
                     if msg is None:
                         if not self.results_always:
-                            shutil.rmtree(result_dir)
+                            with self.timer('artifacts'):
+                                shutil.rmtree(result_dir)
                             for image_type in ['baseline_image', 'diff_image', 'result_image']:
                                 summary[image_type] = None  # image no longer exists
                     else:
                         self._test_results[test_name] = summary
                         pytest.fail(msg, pytrace=False)
 
-                close_mpl_figure(fig)
+                if self.track_memory:
+                    msg = self.check_memory_budget(item, summary)
+                    if msg is not None:
+                        summary['status'] = 'failed'
+                        summary['status_msg'] = msg
+                        self._test_results[test_name] = summary
+                        pytest.fail(msg, pytrace=False)
+
+                if self._render_time is not None and self._render_time['status'] == 'exceeded' \
+                        and self.render_time_mode == 'fail':
+                    msg = self.render_time_message(item)
+                    summary['status'] = 'failed'
+                    summary['status_msg'] = msg
+                    self._test_results[test_name] = summary
+                    pytest.fail(msg, pytrace=False)
 
                 self._test_results[test_name] = summary
 
                 if summary['status'] == 'skipped':
                     pytest.skip(summary['status_msg'])
             except BaseException as e:
-                if hasattr(result, "force_exception"):  # pluggy>=1.2.0
-                    result.force_exception(e)
-                else:
-                    result._result = None
-                    result._excinfo = (type(e), e, e.__traceback__)
+                force_exception(result, e)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+                if fig is not None:
+                    close_mpl_figure(fig)
+                    fig = None  # Don't keep the figure alive through the traceback
+                if self.check_leaks:
+                    self.close_leaked_figures(item, open_figures, summary, result)
+                if profiler is not None:
+                    self.save_profile(item, profiler, summary)
+                if self._draw_profiler is not None:
+                    summary['artists'] = self._draw_profiler.results(self.profile_artists)
+                    self._draw_profiler = None
+                try:
+                    item.config.hook.pytest_mpl_comparison_result(item=item, summary=summary)
+                except BaseException as e:
+                    if result.excinfo is None or isinstance(result.excinfo[1], pytest.skip.Exception):
+                        force_exception(result, e)
+                if self.trace is not None:
+                    self.add_trace_event(test_name, 'test', trace_start, nodeid=item.nodeid)
+                self._timings = None
+                self._memory = None
+                self._render_time = None
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_pyfunc_call(self, pyfuncitem):
+        # Don't run figure tests which are unchanged since they last passed
+        summary = self._test_results.get(generate_test_name(pyfuncitem))
+        if get_compare(pyfuncitem) is not None and summary is not None and summary.get('cached'):
+            return True
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_report_teststatus(self, report, config):
+        results = getattr(report, 'pytest_mpl_results', None)
+        if report.when == 'call' and report.passed and results and results['summary'].get('cached'):
+            return 'passed', 'c', ('PASSED (cached)', {'green': True})
+
+    def check_memory_budget(self, item, summary):
+        """
+        Check the peak memory of the figure test against the ``max_memory``
+        budget (in MiB) of its marker.
+
+        Returns `None` if within budget, otherwise the failure message.
+        """
+        max_memory = summary['max_memory']
+        if max_memory is None:
+            return None
+        # Memory allocated outside of Python, like the Agg buffer, only shows up in the RSS
+        used = {phase: max(usage['peak'], usage['rss_delta']) for phase, usage in summary['memory'].items()}
+        phase = max(used, key=used.get)
+        if used[phase] <= max_memory * 2 ** 20:
+            return None
+        return (f"Error: Figure test used more memory than its budget.\n"
+                f"  Memory used: {used[phase] / 2 ** 20:.1f} MiB (while in the {phase} phase)\n"
+                f"  Budget: {max_memory} MiB")
+
+    def start_profiler(self):
+        """
+        Start profiling the figure test (``--mpl-profile``).
+
+        Returns `None` if not profiling, or if another profiler is already
+        active, since only one can be active at a time.
+        """
+        if not self.profile:
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            return None
+        return profiler
+
+    def save_profile(self, item, profiler, summary):
+        """
+        Save the profile of a figure test to ``profile.prof`` in its results
+        directory, unless the test took less than the profiling threshold.
+        """
+        if sum(summary['timings'].values()) < self.profile_threshold:
+            return
+        profile_file = self.make_test_results_dir(item) / "profile.prof"
+        with self.timer('artifacts'):
+            profiler.dump_stats(profile_file)
+        summary['profile'] = profile_file.relative_to(self.results_dir).as_posix()
+
+    def close_leaked_figures(self, item, open_figures, summary, result):
+        """
+        Close any pyplot figures which were opened by the test and not closed.
+
+        The number of figures is recorded in the summary, and the test either
+        fails or emits a warning.
+        """
+        import matplotlib.pyplot as plt
+        leaked = sorted(set(plt.get_fignums()) - open_figures)
+        for num in leaked:
+            plt.close(num)
+        summary['leaked_figures'] = len(leaked)
+        if not leaked:
+            return
+        msg = f"{generate_test_name(item)} left {len(leaked)} figure(s) open in addition to the figure it returned."
+        # Don't hide an earlier failure, but do fail tests skipped while generating baselines
+        already_failed = result.excinfo is not None and not isinstance(result.excinfo[1], pytest.skip.Exception)
+        try:
+            if self.check_leaks == 'fail':
+                pytest.fail(msg, pytrace=False)
+            else:
+                warnings.warn(msg)
+        except BaseException as e:  # Including warnings turned into errors
+            if not already_failed:
+                force_exception(result, e)
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_runtest_teardown(self, item, nextitem):
+        """
+        Check that the figure returned by the test has been garbage collected
+        once the test and its fixtures have finished (``--mpl-check-released``).
+        """
+        ref = self._figure_refs.pop(item.nodeid, None)
+        if ref is None:
+            return
+        gc.collect()
+        if ref() is not None:
+            pytest.fail(f"The figure returned by {generate_test_name(item)} is still referenced "
+                        "after the test has finished.", pytrace=False)
 
     def generate_hash_library_json(self):
-        if hasattr(self.config, "workerinput"):
-            uid = self.config.pytest_mpl_uid
-            worker_id = os.environ.get("PYTEST_XDIST_WORKER")
-            json_file = self.results_dir / f"generated-hashes-xdist-{uid}-{worker_id}.json"
-        else:
-            json_file = Path(self.config.rootdir) / self.generate_hash_library
-            json_file.parent.mkdir(parents=True, exist_ok=True)
+        json_file = Path(self.config.rootdir) / self.generate_hash_library
+        json_file.parent.mkdir(parents=True, exist_ok=True)
         with open(json_file, 'w') as f:
             json.dump(self._generated_hash_library, f, indent=2)
         return json_file
 
     def generate_summary_json(self):
-        filename = "results.json"
-        if hasattr(self.config, "workerinput"):
-            uid = self.config.pytest_mpl_uid
-            worker_id = os.environ.get("PYTEST_XDIST_WORKER")
-            filename = f"results-xdist-{uid}-{worker_id}.json"
-        json_file = self.results_dir / filename
+        json_file = self.results_dir / "results.json"
         with open(json_file, 'w') as f:
             json.dump(self._test_results, f, indent=2)
         return json_file
 
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        """
+        Attach the comparison results to the test report.
+
+        Under xdist, this is how the results are sent to the controller as
+        each test finishes, so nothing is lost if a worker crashes.
+        """
+        outcome = yield
+        if call.when != 'call' or get_compare(item) is None:
+            return
+        test_name = generate_test_name(item)
+        if test_name in self._test_results:
+            report = outcome.get_result()
+            report.pytest_mpl_results = {
+                'test_name': test_name,
+                'summary': self._test_results[test_name],
+                'generated_hash': self._generated_hash_library.get(test_name),
+            }
+            if self.skip_unchanged:
+                report.pytest_mpl_results['fingerprint'] = self._fingerprints.get(item.nodeid)
+
+    def pytest_runtest_logreport(self, report):
+        results = getattr(report, 'pytest_mpl_results', None)
+        if hasattr(self.config, "workerinput"):
+            return
+        if self.skip_unchanged:
+            # Only remember the fingerprints of tests which pass in every phase
+            if report.failed:
+                self._fingerprints[report.nodeid] = None
+            elif results is not None:
+                self._fingerprints[report.nodeid] = results.get('fingerprint')
+        if results is None:
+            return
+        # On the xdist controller, build up the results as they arrive from the workers
+        self._test_results[results['test_name']] = results['summary']
+        if results['generated_hash'] is not None:
+            self._generated_hash_library[results['test_name']] = results['generated_hash']
+
     def pytest_sessionfinish(self, session):
         """
         Save out the hash library at the end of the run.
         """
         config = session.config
-        is_xdist_worker = hasattr(config, "workerinput")
-        is_xdist_controller = (
-                config.pluginmanager.hasplugin("xdist")
-                and not is_xdist_worker
-                and getattr(config.option, "dist", "") != "no"
-        )
 
-        if is_xdist_controller:  # Merge results from workers
-            uid = config.pytest_mpl_uid
-            for worker_hashes in self.results_dir.glob(f"generated-hashes-xdist-{uid}-*.json"):
-                with worker_hashes.open() as f:
-                    self._generated_hash_library.update(json.load(f))
-            for worker_results in self.results_dir.glob(f"results-xdist-{uid}-*.json"):
-                with worker_results.open() as f:
-                    self._test_results.update(json.load(f))
+        self.restore_backend()
+        for storage in self._baseline_storages.values():
+            storage.close()
+
+        if hasattr(config, "workerinput"):
+            # Test results have already been sent with the test reports, and the
+            # rest is merged by `XdistPlugin.pytest_testnodedown`
+            config.workeroutput["pytest_mpl_mirror_stats"] = self._mirror_health.stats()
+            config.workeroutput["pytest_mpl_warmup_times"] = self._warmup_times
+            config.workeroutput["pytest_mpl_warmup_errors"] = self._warmup_errors
+            config.workeroutput["pytest_mpl_manifest_hits"] = self._manifest_hits
+            config.workeroutput["pytest_mpl_collected_tests"] = self._collected_tests
+            config.workeroutput["pytest_mpl_collection_messages"] = self.collection_messages()
+            if self.trace is not None:
+                self.add_trace_process_name(config.workerinput["workerid"])
+                config.workeroutput["pytest_mpl_trace_events"] = self._trace_events
+            self.stop_tracemalloc()
+            return
+
+        self.stop_tracemalloc()
+
+        # Workers have finished with the baseline archives
+        shutil.rmtree(self._archive_cache_dir, ignore_errors=True)
+
+        if self.skip_unchanged and getattr(config, "cache", None) is not None:
+            fingerprints = config.cache.get(SKIP_UNCHANGED_CACHE_KEY, {})
+            for nodeid, fingerprint in self._fingerprints.items():
+                if fingerprint is None:
+                    fingerprints.pop(nodeid, None)
+                else:
+                    fingerprints[nodeid] = fingerprint
+            config.cache.set(SKIP_UNCHANGED_CACHE_KEY, fingerprints)
+
+        if self.generate_dir is None and self.generate_hash_library is None \
+                and getattr(config, "cache", None) is not None:
+            # Only the failures are kept, and those of tests removed from the collected modules are forgotten
+            collected_modules = set(self._collected_tests.values())
+            outcomes = {
+                test_name: outcome
+                for test_name, outcome in config.cache.get(LAST_OUTCOMES_CACHE_KEY, {}).items()
+                if test_name in self._collected_tests or outcome.get('module') not in collected_modules
+            }
+            for test_name, summary in self._test_results.items():
+                outcome = {key: summary[key] for key in ('status', 'image_status', 'hash_status')}
+                if failed_outcome(outcome):
+                    outcomes[test_name] = {**outcome, 'module': self._collected_tests.get(test_name)}
+                else:
+                    outcomes.pop(test_name, None)
+            config.cache.set(LAST_OUTCOMES_CACHE_KEY, outcomes)
 
         result_hash_library = self.results_dir / (self.results_hash_library_name or "temp.json")
         if self.generate_hash_library is not None:
-            hash_library_path = self.generate_hash_library_json()
-            if self.results_always and not is_xdist_worker:  # Make accessible in results directory
+            with self.trace_span('hash library', 'session'):
+                hash_library_path = self.generate_hash_library_json()
+            if self.results_always:  # Make accessible in results directory
                 # Use same name as generated
                 result_hash_library = self.results_dir / hash_library_path.name
                 shutil.copy(hash_library_path, result_hash_library)
-        elif self.results_always and self.results_hash_library_name and not is_xdist_worker:
+        elif self.results_always and self.results_hash_library_name:
             result_hashes = {k: v['result_hash'] for k, v in self._test_results.items()
                              if v['result_hash']}
             if len(result_hashes) > 0:  # At least one hash comparison test
@@ -1016,23 +2476,115 @@ class ImageComparison:
                     json.dump(result_hashes, fp, indent=2)
 
         if self.generate_summary:
-            if is_xdist_worker:
-                self.generate_summary_json()
-                return
             kwargs = {}
             if 'json' in self.generate_summary:
-                summary = self.generate_summary_json()
+                with self.trace_span('json summary', 'session'):
+                    summary = self.generate_summary_json()
                 print(f"A JSON report can be found at: {summary}")
             if result_hash_library.exists():  # link to it in the HTML
                 kwargs["hash_library"] = result_hash_library.name
             if 'html' in self.generate_summary:
-                summary = generate_summary_html(self._test_results, self.results_dir, **kwargs)
+                with self.trace_span('html summary', 'session'):
+                    summary = generate_summary_html(self._test_results, self.results_dir, **kwargs)
                 print(f"A summary of test results can be found at: {summary}")
             if 'basic-html' in self.generate_summary:
-                summary = generate_summary_basic_html(self._test_results, self.results_dir,
-                                                      **kwargs)
+                with self.trace_span('basic-html summary', 'session'):
+                    summary = generate_summary_basic_html(self._test_results, self.results_dir,
+                                                          **kwargs)
                 print(f"A summary of test results can be found at: {summary}")
 
+        if self.metrics_file is not None:
+            with self.trace_span('metrics', 'session'):
+                written_bytes = sum(path.stat().st_size for path in self.results_dir.rglob('*')
+                                    if path.is_file())
+                write_metrics_file(self.metrics_file, self._test_results,
+                                   mirror_stats=self._mirror_health.stats(),
+                                   manifest_hits=self._manifest_hits, written_bytes=written_bytes)
+
+        if self.trace is not None:
+            # Worker lanes are labelled with their xdist worker ids
+            with_workers = any(event['pid'] != os.getpid() for event in self._trace_events)
+            self.add_trace_process_name("controller" if with_workers else "pytest")
+            print(f"A trace of the test session can be found at: {self.write_trace()}")
+
+    def stop_tracemalloc(self):
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def pytest_terminal_summary(self, terminalreporter):
+        mirror_stats = self._mirror_health.stats()
+        if mirror_stats:
+            terminalreporter.section("pytest-mpl baseline mirrors")
+            for url, stats in mirror_stats.items():
+                latency = "n/a" if stats['latency'] is None else f"{stats['latency'] * 1000:.0f}ms"
+                line = (f"{url}: {stats['successes']} downloaded, {stats['misses']} not found, "
+                        f"{stats['failures']} failed, {stats['skipped']} skipped, "
+                        f"latency {latency}")
+                if stats['open']:
+                    line += " (unavailable)"
+                terminalreporter.write_line(line)
+
+        leaks = {name: summary['leaked_figures'] for name, summary in self._test_results.items()
+                 if summary.get('leaked_figures')}
+        if leaks:
+            terminalreporter.section("pytest-mpl leaked figures")
+            for name, count in leaks.items():
+                terminalreporter.write_line(f"{name}: {count} figure(s) left open")
+            terminalreporter.write_line(f"{sum(leaks.values())} figure(s) left open by {len(leaks)} test(s)")
+
+        if self.durations is not None:
+            self.report_durations(terminalreporter)
+
+        if self._warmup_times:
+            terminalreporter.section("pytest-mpl warm-up")
+            if len(self._warmup_times) == 1:
+                terminalreporter.write_line(f"Warm-up took {self._warmup_times[0]:.2f}s")
+            else:
+                terminalreporter.write_line(
+                    f"Warm-up took {sum(self._warmup_times):.2f}s over {len(self._warmup_times)} workers "
+                    f"(slowest {max(self._warmup_times):.2f}s)"
+                )
+            for error in sorted(set(self._warmup_errors)):
+                terminalreporter.write_line(f"Warm-up failed: {error}")
+
+        # The xdist controller doesn't collect tests, so show what the workers selected
+        if self._worker_collection_messages:
+            terminalreporter.section("pytest-mpl selection")
+            for message in self._worker_collection_messages:
+                terminalreporter.write_line(message)
+
+    def report_durations(self, terminalreporter):
+        """
+        Show the slowest figure tests, broken down by phase (``--mpl-durations``).
+        """
+        rows = []
+        for name, summary in self._test_results.items():
+            timings = summary.get('timings')
+            if timings:
+                columns = [sum(timings[phase] for phase in phases) for phases in DURATION_COLUMNS.values()]
+                rows.append((sum(timings.values()), columns, name))
+        if not rows:
+            return
+        rows.sort(key=lambda row: row[0], reverse=True)
+        shown = rows[:self.durations] if self.durations > 0 else rows
+
+        title = "slowest figure tests" if self.durations <= 0 else f"slowest {len(shown)} figure tests"
+        terminalreporter.section(f"pytest-mpl {title}")
+        header = ["total"] + list(DURATION_COLUMNS)
+        terminalreporter.write_line("".join(f"{h:>9}" for h in header) + "  test")
+        for total, columns, name in shown:
+            terminalreporter.write_line("".join(f"{t:>8.3f}s" for t in [total] + columns) + f"  {name}")
+
+        # Totals for each phase across all figure tests
+        totals = [sum(row[1][i] for row in rows) for i in range(len(DURATION_COLUMNS))]
+        overall = sum(row[0] for row in rows)
+        terminalreporter.write_line("".join(f"{t:>8.3f}s" for t in [overall] + totals) +
+                                    f"  total of {len(rows)} figure tests")
+        if overall > 0:
+            terminalreporter.write_line("".join(f"{t / overall:>9.0%}" for t in [overall] + totals) +
+                                        "  of the total time")
+
 
 class FigureCloser:
     """
@@ -1053,5 +2605,5 @@ class FigureCloser:
             if test_name not in self.return_value:
                 # Test function did not complete successfully
                 return
-            fig = self.return_value[test_name]
+            fig = self.return_value.pop(test_name)
             close_mpl_figure(fig)
@@ -0,0 +1,558 @@
+"""
+Storage backends for baseline images.
+
+The backend used for a baseline location is selected by its URL scheme:
+
+* ``file://`` or a plain path: a local directory (`FileSystemStorage`)
+* ``http://`` or ``https://``: a remote directory, optionally with
+  comma-separated mirrors (`HTTPStorage`)
+* ``zip://`` or a ``http(s)://`` URL ending in ``.zip``, ``.tar.gz`` or
+  ``.tgz``: an archive of baseline images (`ArchiveStorage`)
+* ``s3://``: an S3-compatible object store (`S3Storage`)
+
+Other packages can provide backends for additional schemes by registering a
+`BaselineStorage` subclass in the ``pytest_mpl.baseline_storage`` entry point
+group, with the scheme as the entry point name.
+"""
+
+import io
+import os
+import re
+import gzip
+import hmac
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import tarfile
+import zipfile
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from datetime import datetime, timezone
+from urllib.error import HTTPError
+from urllib.parse import quote, urlsplit
+from urllib.request import Request, urlopen
+from concurrent.futures import ThreadPoolExecutor
+from importlib.metadata import entry_points
+
+__all__ = ['BaselineStorage', 'FileSystemStorage', 'HTTPStorage', 'ArchiveStorage',
+           'S3Storage', 'BaselineArchive', 'get_storage_backend', 'resolve_location', 'create_once']
+
+ENTRY_POINT_GROUP = 'pytest_mpl.baseline_storage'
+
+# Remote baseline archives, which are downloaded once per session
+ARCHIVE_EXTENSIONS = ('.zip', '.tar.gz', '.tgz')
+
+# Number of seconds after which the lock of an xdist worker downloading files is
+# assumed to be stale, if the worker has stopped refreshing it
+LOCK_STALE_TIMEOUT = 60
+
+# Maximum number of concurrent requests made by the batch operations of remote backends
+MAX_CONCURRENT_REQUESTS = 8
+
+EMPTY_SHA256 = hashlib.sha256(b'').hexdigest()
+
+_SCHEME_RE = re.compile(r'^([a-zA-Z][a-zA-Z0-9+.-]*)://')
+
+
+def get_scheme(location):
+    """
+    Return the URL scheme of a baseline location, or `None` if it is a plain path.
+    """
+    match = _SCHEME_RE.match(str(location))
+    return match.group(1).lower() if match else None
+
+
+def is_archive_url(baseline):
+    """
+    Whether ``baseline`` is a (comma-separated list of) remote archive URL(s).
+    """
+    return all(url.lower().endswith(ARCHIVE_EXTENSIONS) for url in baseline.split(','))
+
+
+def resolve_location(location, base_dir):
+    """
+    Make a local baseline location absolute, relative to ``base_dir``.
+
+    Plain paths are returned as a `~pathlib.Path`, while locations with a
+    scheme are returned as a string. Only ``file://`` and ``zip://`` locations
+    can be relative.
+    """
+    scheme = get_scheme(location)
+    if scheme is None:
+        return Path(os.path.normpath(os.path.join(base_dir, location)))
+    if scheme in ('file', 'zip'):
+        prefix = f'{scheme}://'
+        path = os.path.normpath(os.path.join(base_dir, location[len(prefix):]))
+        return prefix + path
+    return location
+
+
+def get_storage_backend(location):
+    """
+    Return the `BaselineStorage` subclass to use for a baseline location.
+    """
+    scheme = get_scheme(location) or 'file'
+    if scheme in ('http', 'https') and is_archive_url(location):
+        scheme = 'zip'
+    backends = {
+        'file': FileSystemStorage,
+        'http': HTTPStorage,
+        'https': HTTPStorage,
+        'zip': ArchiveStorage,
+        's3': S3Storage,
+    }
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        backends[entry_point.name] = entry_point.load()
+    if scheme not in backends:
+        raise ValueError(f"No baseline storage backend is available for '{scheme}://' locations.")
+    return backends[scheme]
+
+
+def write_temporary(content):
+    """
+    Write downloaded content to a new temporary file and return its path.
+    """
+    result_dir = Path(tempfile.mkdtemp())
+    filename = result_dir / 'downloaded'
+    with open(str(filename), 'wb') as tmpfile:
+        tmpfile.write(content)
+    return filename
+
+
+def create_once(path, create, timeout=LOCK_STALE_TIMEOUT):
+    """
+    Create ``path`` in only one of the xdist workers, which share it.
+
+    ``create`` is called with a temporary path to write the file or directory
+    to, which is then renamed to ``path``, and returns `False` if it could not
+    be created. The worker creating ``path`` holds a lock file, whose
+    modification time it refreshes while ``create`` runs. The other workers
+    wait for as long as it does, unless the lock has not been refreshed for
+    ``timeout`` seconds, in which case it is assumed to be stale and is
+    removed. Returns whether ``path`` exists.
+    """
+    path = Path(path)
+    lock_path = path.with_name(f"{path.name}.lock")
+    while not path.exists():
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:  # Another worker is creating it
+            try:
+                stale = time.time() - lock_path.stat().st_mtime > timeout
+            except FileNotFoundError:  # The other worker has just finished
+                continue
+            if stale:  # The other worker has died, so take over its lock
+                lock_path.unlink(missing_ok=True)
+            else:
+                time.sleep(0.1)
+            continue
+        done = threading.Event()
+
+        def refresh_lock():
+            while not done.wait(timeout / 10):
+                try:
+                    os.utime(lock_path)
+                except OSError:
+                    pass
+
+        refresher = threading.Thread(target=refresh_lock, daemon=True)
+        refresher.start()
+        try:
+            tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+            if create(tmp_path) is not False:
+                os.replace(tmp_path, path)
+        finally:
+            done.set()
+            refresher.join()
+            os.close(fd)
+            os.unlink(lock_path)
+        break
+    return path.exists()
+
+
+class BaselineStorage(ABC):
+    """
+    Base class for baseline image storage backends.
+
+    Subclasses must implement `read`. Backends where requests are expensive
+    should also override `exists` and `get`, which operate on several files at
+    once, so that the requests can be made concurrently or pipelined. The
+    plugin fetches the baseline images of all the tests of a session which use
+    a backend with `prefetch` enabled in a single call to `get`.
+
+    Parameters
+    ----------
+    location : str or Path
+        The baseline location, e.g. a directory path or URL.
+    plugin : `pytest_mpl.plugin.ImageComparison`
+        The plugin instance, which holds the state for the test session.
+    """
+
+    #: Whether a ``manifest.json`` of SHA-256 digests is looked for at the root of the location
+    use_manifest = True
+
+    #: Whether the baseline images of the whole session are fetched at once, rather than as each test needs them
+    prefetch = True
+
+    def __init__(self, location, plugin):
+        self.location = location
+        self.plugin = plugin
+        self._manifest = None
+        self._manifest_loaded = False
+
+    @abstractmethod
+    def read(self, filename):
+        """
+        Return the contents of ``filename``, or `None` if it is not available.
+        """
+
+    def exists(self, filenames):
+        """
+        Return whether each file in ``filenames`` is available.
+        """
+        return [self.read(filename) is not None for filename in filenames]
+
+    def get(self, filenames):
+        """
+        Return a local path for each file in ``filenames``, or `None` where it is not available.
+        """
+        paths = []
+        for filename in filenames:
+            content = self.read(filename)
+            paths.append(None if content is None else write_temporary(content))
+        return paths
+
+    def manifest_entry(self, filename):
+        """
+        Return the manifest entry for ``filename``, or `None` if there isn't one.
+
+        The manifest is read once, and maps filenames to either their SHA-256
+        digest or a dictionary with ``sha256`` and (optionally) ``shape`` keys.
+        The entry is always returned as a dictionary.
+        """
+        if not self.use_manifest:
+            return
+        if not self._manifest_loaded:
+            self._manifest_loaded = True
+            content = self.read('manifest.json')
+            if content is not None:
+                try:
+                    self._manifest = json.loads(content)
+                except ValueError as e:
+                    self.plugin.get_logger().info(f'Ignoring invalid baseline manifest: {repr(e)}')
+        if not self._manifest:
+            return
+        entry = self._manifest.get(filename)
+        if isinstance(entry, str):
+            entry = {'sha256': entry}
+        return entry
+
+    def missing_message(self):
+        """
+        Message to report when a baseline image is not available.
+        """
+        return "Could not download the baseline image from any of the available URLs.\n"
+
+    def close(self):
+        """
+        Release any resources at the end of the session.
+        """
+
+
+class FileSystemStorage(BaselineStorage):
+    """
+    Baseline images in a local directory.
+    """
+
+    use_manifest = False
+    prefetch = False
+
+    def __init__(self, location, plugin):
+        super().__init__(location, plugin)
+        if get_scheme(location) == 'file':
+            location = location[len('file://'):]
+        self.path = Path(location)
+
+    def read(self, filename):
+        path = self.path / filename
+        if path.exists():
+            return path.read_bytes()
+
+    def exists(self, filenames):
+        return [(self.path / filename).exists() for filename in filenames]
+
+    def get(self, filenames):
+        # No need to copy, as the plugin copies the baseline into the results directory
+        return [path if path.exists() else None
+                for path in [(self.path / filename).absolute() for filename in filenames]]
+
+    def missing_message(self):
+        return f"Image file not found for comparison test in: \n\t{self.path}\n"
+
+
+def _map_concurrently(function, filenames):
+    if len(filenames) <= 1:
+        return [function(filename) for filename in filenames]
+    with ThreadPoolExecutor(max_workers=min(len(filenames), MAX_CONCURRENT_REQUESTS)) as executor:
+        return list(executor.map(function, filenames))
+
+
+class HTTPStorage(BaselineStorage):
+    """
+    Baseline images in a remote directory, with optional comma-separated mirrors.
+
+    Downloads go through the plugin, so that mirror health is tracked for the
+    whole session. Downloads are checked against the manifest digest, if any.
+    """
+
+    def read(self, filename):
+        return self.plugin._download_content(self.location, filename)
+
+    def _get_one(self, filename):
+        digest = (self.manifest_entry(filename) or {}).get('sha256')
+        return self.plugin._download_file(self.location, filename, digest=digest)
+
+    def exists(self, filenames):
+        return [path is not None for path in self.get(filenames)]
+
+    def get(self, filenames):
+        self.manifest_entry('')  # Load the manifest before downloading concurrently
+        return _map_concurrently(self._get_one, filenames)
+
+
+class BaselineArchive:
+    """
+    Read individual baseline images from a ``.zip`` or uncompressed ``.tar`` archive.
+
+    The archive is indexed once when opened, and members are then read
+    directly without extracting the rest of the archive. If all the images are
+    inside a single top-level directory, they can also be looked up relative
+    to that directory.
+
+    Parameters
+    ----------
+    path : str or Path
+        Path to the archive file.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        if zipfile.is_zipfile(self.path):
+            self._zip = zipfile.ZipFile(self.path)
+            members = {info.filename: info for info in self._zip.infolist() if not info.is_dir()}
+        else:
+            self._zip = None
+            with tarfile.open(self.path, 'r:') as tar:
+                members = {m.name: (m.offset_data, m.size) for m in tar.getmembers() if m.isfile()}
+        self._index = dict(members)
+        for name, member in members.items():
+            if '/' in name:
+                self._index.setdefault(name.split('/', 1)[1], member)
+
+    def read(self, name):
+        """
+        Return the contents of the member ``name``, or `None` if it does not exist.
+        """
+        member = self._index.get(name)
+        if member is None:
+            return
+        if self._zip is not None:
+            return self._zip.read(member)
+        offset, size = member
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            return f.read(size)
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+
+
+class ArchiveStorage(BaselineStorage):
+    """
+    Baseline images in a single ``.zip``, ``.tar``, ``.tar.gz`` or ``.tgz`` archive.
+
+    The location is either ``zip://<path>`` for a local archive, or remote
+    archive URL(s) with optional comma-separated mirrors. Remote and gzipped
+    archives are stored (decompressed) in a cache directory for the session,
+    and only one xdist worker downloads each archive.
+    """
+
+    use_manifest = False
+    prefetch = False  # The archive itself is downloaded once
+
+    def __init__(self, location, plugin):
+        super().__init__(location, plugin)
+        self.remote = get_scheme(location) != 'zip'
+        self.path = location if self.remote else location[len('zip://'):]
+        self._archive = None
+        self._loaded = False
+
+    def _load(self):
+        if not self.remote and not self.path.lower().endswith(('.tar.gz', '.tgz')):
+            return BaselineArchive(self.path) if os.path.exists(self.path) else None
+
+        key = hashlib.sha256(self.location.encode()).hexdigest()
+        cache_dir = self.plugin._archive_cache_dir
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        is_zip = self.path.split(',')[0].lower().endswith('.zip')
+        archive_path = cache_dir / (key + ('.zip' if is_zip else '.tar'))
+
+        def download(tmp_path):
+            if self.remote:
+                content = self.plugin._download_content(self.path, '')
+            elif os.path.exists(self.path):
+                content = Path(self.path).read_bytes()
+            else:
+                content = None
+            if content is None:
+                return False
+            if is_zip:
+                tmp_path.write_bytes(content)
+            else:
+                with gzip.GzipFile(fileobj=io.BytesIO(content)) as src, open(tmp_path, 'wb') as dst:
+                    shutil.copyfileobj(src, dst)
+
+        if create_once(archive_path, download):
+            return BaselineArchive(archive_path)
+
+    @property
+    def archive(self):
+        if not self._loaded:  # Only try to download each archive once
+            self._loaded = True
+            self._archive = self._load()
+        return self._archive
+
+    def read(self, filename):
+        if self.archive is not None:
+            return self.archive.read(filename)
+
+    def missing_message(self):
+        if self.archive is None:
+            if self.remote:
+                return "Could not download the baseline archive from any of the available URLs.\n"
+            return f"Baseline archive not found: \n\t{self.path}\n"
+        return f"Image file not found for comparison test in: \n\t{self.path}\n"
+
+    def close(self):
+        if self._archive is not None:
+            self._archive.close()
+
+
+def sign_s3_request(method, url, headers, access_key, secret_key, region,
+                    session_token=None, amz_date=None):
+    """
+    Return ``headers`` with the AWS Signature Version 4 headers for an S3 request added.
+
+    The request must not have a body.
+    """
+    parts = urlsplit(url)
+    if amz_date is None:
+        amz_date = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    headers = dict(headers)
+    headers['host'] = parts.netloc
+    headers['x-amz-date'] = amz_date
+    headers['x-amz-content-sha256'] = EMPTY_SHA256
+    if session_token:
+        headers['x-amz-security-token'] = session_token
+
+    canonical_headers = sorted((k.lower(), str(v).strip()) for k, v in headers.items())
+    signed_headers = ';'.join(k for k, _ in canonical_headers)
+    canonical_request = '\n'.join([
+        method,
+        parts.path or '/',
+        parts.query,
+        ''.join(f'{k}:{v}\n' for k, v in canonical_headers),
+        signed_headers,
+        EMPTY_SHA256,
+    ])
+    scope = f"{amz_date[:8]}/{region}/s3/aws4_request"
+    string_to_sign = '\n'.join([
+        'AWS4-HMAC-SHA256',
+        amz_date,
+        scope,
+        hashlib.sha256(canonical_request.encode()).hexdigest(),
+    ])
+    key = ('AWS4' + secret_key).encode()
+    for part in [amz_date[:8], region, 's3', 'aws4_request']:
+        key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+    signature = hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+    headers['Authorization'] = (f"AWS4-HMAC-SHA256 Credential={access_key}/{scope}, "
+                                f"SignedHeaders={signed_headers}, Signature={signature}")
+    return headers
+
+
+class S3Storage(BaselineStorage):
+    """
+    Baseline images in an S3-compatible object store, at ``s3://<bucket>/<prefix>/``.
+
+    The standard ``AWS_ACCESS_KEY_ID``, ``AWS_SECRET_ACCESS_KEY``,
+    ``AWS_SESSION_TOKEN`` and ``AWS_REGION`` (or ``AWS_DEFAULT_REGION``)
+    environment variables are used to sign requests. Requests are unsigned if
+    no credentials are set. Other S3-compatible services (e.g. MinIO) can be
+    used by setting ``AWS_ENDPOINT_URL_S3`` or ``AWS_ENDPOINT_URL``, in which
+    case path-style addressing is used.
+    """
+
+    def __init__(self, location, plugin):
+        super().__init__(location, plugin)
+        parts = urlsplit(location)
+        self.bucket = parts.netloc
+        self.prefix = parts.path.lstrip('/')
+        if self.prefix and not self.prefix.endswith('/'):
+            self.prefix += '/'
+        endpoint = os.environ.get('AWS_ENDPOINT_URL_S3') or os.environ.get('AWS_ENDPOINT_URL')
+        if endpoint:
+            self.base_url = f"{endpoint.rstrip('/')}/{self.bucket}/"
+        else:
+            self.base_url = f"https://{self.bucket}.s3.amazonaws.com/"
+        self.region = os.environ.get('AWS_REGION') or os.environ.get('AWS_DEFAULT_REGION') or 'us-east-1'
+        self.access_key = os.environ.get('AWS_ACCESS_KEY_ID')
+        self.secret_key = os.environ.get('AWS_SECRET_ACCESS_KEY')
+        self.session_token = os.environ.get('AWS_SESSION_TOKEN')
+
+    def _request(self, method, filename):
+        url = self.base_url + quote(self.prefix + filename, safe='/')
+        headers = {}
+        if self.access_key and self.secret_key:
+            headers = sign_s3_request(method, url, headers, self.access_key, self.secret_key,
+                                      self.region, session_token=self.session_token)
+        try:
+            with urlopen(Request(url, headers=headers, method=method)) as response:
+                return response.read() if method == 'GET' else True
+        except HTTPError as e:
+            if e.code not in (403, 404):  # S3 returns 403 for missing keys without list access
+                self.plugin.get_logger().info(f'Requesting {url} failed: {repr(e)}')
+        except Exception as e:
+            self.plugin.get_logger().info(f'Requesting {url} failed: {repr(e)}')
+
+    def read(self, filename):
+        return self._request('GET', filename)
+
+    def exists(self, filenames):
+        return [result is not None
+                for result in _map_concurrently(lambda f: self._request('HEAD', f), filenames)]
+
+    def get(self, filenames):
+        self.manifest_entry('')  # Load the manifest before downloading concurrently
+
+        def get_one(filename):
+            content = self.read(filename)
+            if content is None:
+                return
+            digest = (self.manifest_entry(filename) or {}).get('sha256')
+            if digest is not None and hashlib.sha256(content).hexdigest() != digest:
+                self.plugin.get_logger().info(f'Downloading {filename} from {self.location} failed: '
+                                              'SHA-256 does not match the baseline manifest')
+                return
+            return write_temporary(content)
+
+        return _map_concurrently(get_one, filenames)
+
+    def missing_message(self):
+        return f"Image file not found for comparison test in: \n\t{self.location}\n"
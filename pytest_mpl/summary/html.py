@@ -60,6 +60,14 @@ class Results:
                 return True
         return False
 
+    @cached_property
+    def timing_phases(self):
+        """Phases of the figure tests which were timed, in the order they happen."""
+        for result in self.cards:
+            if result.timings:
+                return list(result.timings)
+        return []
+
     @cached_property
     def hash_comparison(self):
         """Whether at least one hash comparison test or generation was performed."""
@@ -107,7 +115,26 @@ class Result:
     @cached_property
     def indexes(self):
         """Dictionary with strings optimized for sorting."""
-        return {'status': self._status_sort, 'rms': self._rms_sort}
+        indexes = {'status': self._status_sort, 'rms': self._rms_sort}
+        for phase, seconds in self.timings.items():
+            indexes[f"{phase.replace('_', '-')}-time"] = self._time_sort(seconds)
+        indexes['total-time'] = self._time_sort(self.total_time)
+        return indexes
+
+    @staticmethod
+    def _time_sort(seconds):
+        """Time in microseconds for sorting."""
+        return f"{seconds * 1e6:012.0f}"
+
+    @property
+    def timings(self):
+        """Time taken by each phase of the test, in seconds."""
+        return self.__dict__.get('timings') or {}
+
+    @property
+    def total_time(self):
+        """Total time of all the timed phases, in seconds."""
+        return sum(self.timings.values())
 
     @property
     def _status_sort(self):
@@ -187,6 +214,21 @@ def image_status_msg(status):
     return messages[status]
 
 
+def format_duration(seconds):
+    """Duration in seconds to a string in milliseconds."""
+    return f"{seconds * 1000:.1f} ms"
+
+
+def format_bytes(size):
+    """Size in bytes to a string in mebibytes."""
+    return f"{size / 2 ** 20:.1f} MiB"
+
+
+def phase_name(phase):
+    """Timing phase to a human readable name."""
+    return phase.replace('_', ' ').capitalize()
+
+
 def hash_status_msg(status):
     """Hash status to status message."""
     messages = {
@@ -222,6 +264,9 @@ def generate_summary_html(results, results_dir, hash_library=None):
     env.filters["status_class"] = status_class
     env.filters["image_status_msg"] = image_status_msg
     env.filters["hash_status_msg"] = hash_status_msg
+    env.filters["format_duration"] = format_duration
+    env.filters["format_bytes"] = format_bytes
+    env.filters["phase_name"] = phase_name
 
     # Render HTML starting from the base template
     template = env.get_template("base.html")
@@ -258,6 +303,11 @@ def generate_summary_basic_html(results, results_dir, hash_library=None):
         autoescape=select_autoescape()
     )
 
+    # Register additional Jinja filters
+    env.filters["format_duration"] = format_duration
+    env.filters["format_bytes"] = format_bytes
+    env.filters["phase_name"] = phase_name
+
     # Render HTML starting from the base template
     template = env.get_template("basic.html")
     html = template.render(results=Results(results), hash_library=hash_library)
@@ -9,6 +9,12 @@ var options = {
     valueNames: ['collected-sort', 'test-name', 'status-sort', 'rms-sort', 'filter-classes',
         'rms-value', 'baseline-hash-value', 'result-hash-value']
 };
+// Add the sort indexes which depend on the results (e.g. the timed phases)
+document.querySelectorAll('.sort').forEach(function (elem) {
+    if (!options.valueNames.includes(elem.dataset['sort'])) {
+        options.valueNames.push(elem.dataset['sort']);
+    }
+})
 var resultsList = new List('results', options);
 
 var filterClasses = [];
@@ -1,3 +1,9 @@
+import threading
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+# Keep pyplot loaded across the in-process pytester runs
+import matplotlib.pyplot  # noqa: F401
 import pytest
 from packaging.version import Version
 
@@ -7,3 +13,32 @@ if Version(pytest.__version__) < Version("6.2.0"):
     @pytest.fixture
     def pytester(testdir):
         return testdir
+
+
+class RecordingHandler(SimpleHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requested_paths.append(self.path)
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def serve_directory():
+    """
+    Serve local directories over HTTP, returning the base URL and a list of requested paths.
+    """
+    servers = []
+
+    def serve(directory):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), partial(RecordingHandler, directory=str(directory)))
+        server.requested_paths = []
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}/", server.requested_paths
+
+    yield serve
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -29,3 +29,45 @@ def skip_if_format_unsupported(file_format, using_hashes=False):
             pytest.skip('Comparing SVG files requires inkscape to be installed')
         else:
             pytest.skip('Comparing EPS and PDF files requires ghostscript to be installed')
+
+
+# A conftest.py which replaces the time module of the plugin, so that the
+# durations it measures are deterministic. Its clock only advances when a test
+# calls ``clock.sleep``, so everything else takes no time at all.
+FAKE_CLOCK_CONFTEST = """
+import time
+
+import pytest
+
+import pytest_mpl.plugin
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+_clock = FakeClock()
+
+
+def pytest_configure(config):
+    pytest_mpl.plugin.time = _clock
+
+
+def pytest_unconfigure(config):
+    pytest_mpl.plugin.time = time
+
+
+@pytest.fixture
+def clock():
+    return _clock
+"""
@@ -72,8 +72,14 @@ def diff_summary(baseline, result, baseline_hash_library=None, result_hash_libra
     for test in baseline_tests:
 
         # Get baseline and result summary for the specific test
-        baseline_summary = baseline[test]
-        result_summary = result[test]
+        baseline_summary = dict(baseline[test])
+        result_summary = dict(result[test])
+
+        # Timings differ between runs, so only check that they were recorded
+        # (hash libraries are also compared with this function, and have no timings)
+        baseline_summary.pop('timings', None)
+        if not isinstance(result_summary.pop('timings', None), dict) and 'status' in result_summary:
+            item_match_errors.append(f'Summary for {test} has no timings.')
 
         # Swap the baseline and result hashes in the summary
         # for the corresponding hashes in each hash library
@@ -240,7 +240,7 @@ def test_html_xdist(request, tmp_path, num_workers):
     assert (tmp_path / 'results' / 'styles.css').exists()
     if num_workers is not None:
         assert len(list((tmp_path / 'results').glob('generated-hashes-xdist-*-*.json'))) == 0
-        assert len(list((tmp_path / 'results').glob('results-xdist-*-*.json'))) == num_workers
+        assert len(list((tmp_path / 'results').glob('results-xdist-*-*.json'))) == 0
 
 
 def test_html_hashes_only(tmp_path):
@@ -326,8 +326,8 @@ def test_html_generate_xdist(request, tmp_path, num_workers):
     assert (tmp_path / 'results' / 'extra.js').exists()
     assert (tmp_path / 'results' / 'styles.css').exists()
     if num_workers is not None:
-        assert len(list((tmp_path / 'results').glob('generated-hashes-xdist-*-*.json'))) == num_workers
-        assert len(list((tmp_path / 'results').glob('results-xdist-*-*.json'))) == num_workers
+        assert len(list((tmp_path / 'results').glob('generated-hashes-xdist-*-*.json'))) == 0
+        assert len(list((tmp_path / 'results').glob('results-xdist-*-*.json'))) == 0
 
 
 def test_html_generate_images_only(tmp_path):
@@ -0,0 +1,78 @@
+import shutil
+import tarfile
+
+import pytest
+from helpers import pytester_path
+
+from pytest_mpl.storage import BaselineArchive
+
+TEST_FILE = """
+import matplotlib.pyplot as plt
+import pytest
+@pytest.mark.parametrize("i", range(4))
+@pytest.mark.mpl_image_compare
+def test_mpl(i):
+    fig, ax = plt.subplots()
+    ax.plot([1, 2, i])
+    return fig
+"""
+
+
+def make_archive(path, archive_format):
+    """
+    Generate baseline images and pack them into ``path/archives``.
+    """
+    archives = path / "archives"
+    archives.mkdir()
+    if archive_format == "zip":
+        shutil.make_archive(archives / "baseline", "zip", root_dir=path, base_dir="baseline")
+        return "baseline.zip"
+    with tarfile.open(archives / "baseline.tar.gz", "w:gz") as tar:
+        tar.add(path / "baseline", arcname="baseline")
+    return "baseline.tar.gz"
+
+
+def test_archive_index(tmp_path):
+    (tmp_path / "baseline").mkdir()
+    (tmp_path / "baseline" / "a.png").write_bytes(b"a")
+    (tmp_path / "b.png").write_bytes(b"b")
+    with tarfile.open(tmp_path / "baseline.tar", "w") as tar:
+        tar.add(tmp_path / "baseline", arcname="baseline")
+        tar.add(tmp_path / "b.png", arcname="b.png")
+    archive = BaselineArchive(tmp_path / "baseline.tar")
+    assert archive.read("baseline/a.png") == b"a"
+    assert archive.read("a.png") == b"a"  # relative to the top-level directory
+    assert archive.read("b.png") == b"b"
+    assert archive.read("c.png") is None
+
+
+@pytest.mark.parametrize("archive_format, xdist", [
+    ("zip", False),
+    ("tar.gz", False),
+    ("zip", True),
+])
+def test_archive(pytester, serve_directory, archive_format, xdist):
+    path = pytester_path(pytester)
+    pytester.makepyfile(TEST_FILE)
+    pytester.runpytest("--mpl-generate-path=baseline").assert_outcomes(skipped=4)
+    archive_name = make_archive(path, archive_format)
+
+    url, requested_paths = serve_directory(path / "archives")
+    args = ["--mpl", f"--mpl-baseline-path=http://127.0.0.1:1/{archive_name},{url}{archive_name}"]
+    args += ["-n", "2"] if xdist else ["-p", "no:xdist"]
+    result = pytester.runpytest(*args)
+    result.assert_outcomes(passed=4)
+    assert requested_paths == [f"/{archive_name}"]  # Downloaded once for the whole session
+
+
+def test_archive_missing_image(pytester, serve_directory):
+    path = pytester_path(pytester)
+    pytester.makepyfile(TEST_FILE)
+    pytester.runpytest("--mpl-generate-path=baseline").assert_outcomes(skipped=4)
+    (path / "baseline" / "test_mpl_3.png").unlink()
+    archive_name = make_archive(path, "zip")
+
+    url, _ = serve_directory(path / "archives")
+    result = pytester.runpytest("--mpl", f"--mpl-baseline-path={url}{archive_name}", "-p", "no:xdist")
+    result.assert_outcomes(passed=3, failed=1)
+    result.stdout.fnmatch_lines(["*Image file not found for comparison test in:*"])
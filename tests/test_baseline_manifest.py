@@ -0,0 +1,71 @@
+import json
+import shutil
+import hashlib
+
+import pytest
+from helpers import pytester_path
+
+TEST_FILE = """
+import matplotlib.pyplot as plt
+import pytest
+@pytest.mark.parametrize("i", range(3))
+@pytest.mark.mpl_image_compare
+def test_mpl(i):
+    fig, ax = plt.subplots()
+    ax.plot([1, 2, {last}])
+    return fig
+"""
+
+
+def generate_baseline(pytester, shape=False):
+    path = pytester_path(pytester)
+    pytester.makepyfile(TEST_FILE.format(last="i"))
+    pytester.runpytest("--mpl-generate-path=baseline").assert_outcomes(skipped=3)
+    manifest = {}
+    for image in (path / "baseline").glob("*.png"):
+        digest = hashlib.sha256(image.read_bytes()).hexdigest()
+        manifest[image.name] = {"sha256": digest, "shape": [600, 800]} if shape else digest
+    (path / "baseline" / "manifest.json").write_text(json.dumps(manifest))
+    return path / "baseline"
+
+
+@pytest.mark.parametrize("results_always", [False, True])
+def test_manifest_skips_download(pytester, serve_directory, results_always):
+    path = pytester_path(pytester)
+    url, requested_paths = serve_directory(generate_baseline(pytester))
+    args = ["--mpl", f"--mpl-baseline-path={url}", "-p", "no:xdist",
+            f"--mpl-results-path={path / 'results'}"]
+    if results_always:
+        args.append("--mpl-results-always")
+    result = pytester.runpytest(*args)
+    result.assert_outcomes(passed=3)
+    assert requested_paths == ["/manifest.json"]
+    if results_always:
+        assert (path / "results" / "test_manifest_skips_download.test_mpl_0" / "baseline.png").exists()
+
+
+def test_manifest_different_result(pytester, serve_directory):
+    url, requested_paths = serve_directory(generate_baseline(pytester, shape=True))
+    pytester.makepyfile(TEST_FILE.format(last="i + 1"))
+    result = pytester.runpytest("--mpl", f"--mpl-baseline-path={url}", "-p", "no:xdist")
+    result.assert_outcomes(failed=3)
+    result.stdout.fnmatch_lines(["*Image files did not match*"])
+    assert sorted(requested_paths) == ["/manifest.json", "/test_mpl_0.png", "/test_mpl_1.png", "/test_mpl_2.png"]
+
+
+def test_manifest_integrity(pytester, serve_directory):
+    path = pytester_path(pytester)
+    baseline = generate_baseline(pytester)
+    shutil.copytree(baseline, path / "corrupt")
+    (path / "corrupt" / "test_mpl_0.png").write_bytes(b"not an image")
+    corrupt_url, _ = serve_directory(path / "corrupt")
+    url, _ = serve_directory(baseline)
+
+    # Make the result differ so that the baseline image has to be downloaded
+    pytester.makepyfile(TEST_FILE.format(last="i + 1"))
+    result = pytester.runpytest("--mpl", f"--mpl-baseline-path={corrupt_url},{url}",
+                                "-p", "no:xdist", "-k", "test_mpl[0]")
+    result.assert_outcomes(failed=1)
+    result.stdout.fnmatch_lines(["*Image files did not match*"])
+    # The manifest is downloaded from the first mirror, but the corrupt image is rejected
+    result.stdout.fnmatch_lines([f"{corrupt_url}: 1 downloaded, 1 not found*", f"{url}: 1 downloaded*"])
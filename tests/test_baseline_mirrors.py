@@ -0,0 +1,86 @@
+import socket
+
+import pytest
+from helpers import pytester_path
+
+from pytest_mpl.plugin import MirrorHealth
+
+TEST_FILE = """
+import matplotlib.pyplot as plt
+import pytest
+@pytest.mark.parametrize("i", range(4))
+@pytest.mark.mpl_image_compare(filename="test_mpl.png")
+def test_mpl(i):
+    fig, ax = plt.subplots()
+    ax.plot([1, 2, 3])
+    return fig
+"""
+
+
+def dead_mirror():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    return f"http://127.0.0.1:{port}/"
+
+
+def test_order_by_latency():
+    health = MirrorHealth()
+    assert health.order(["a", "b", "c"]) == ["a", "b", "c"]
+    health.record_success("a", 0.5)
+    health.record_miss("b", 0.1)
+    assert health.order(["a", "b", "c"]) == ["b", "a", "c"]
+
+
+def test_circuit_breaker():
+    health = MirrorHealth(failure_threshold=2, cooldown=1000)
+    health.record_failure("a")
+    assert health.order(["a", "b"]) == ["a", "b"]
+    health.record_failure("a")
+    assert health.order(["a", "b"]) == ["b"]
+    stats = health.stats()["a"]
+    assert stats["open"] and stats["failures"] == 2 and stats["skipped"] == 1
+
+    # After the cooldown a single attempt is allowed again
+    health.cooldown = 0
+    assert health.order(["a", "b"]) == ["a", "b"]
+    health.record_failure("a")
+    assert health.stats()["a"]["open"]
+
+
+def test_merge():
+    health = MirrorHealth()
+    health.record_success("a", 1)
+    other = MirrorHealth()
+    other.record_success("a", 3)
+    other.record_success("a", 3)
+    other.record_failure("b")
+    health.merge(other.stats())
+    stats = health.stats()
+    assert stats["a"]["successes"] == 3
+    assert stats["a"]["latency"] == pytest.approx(7 / 3)
+    assert stats["b"]["failures"] == 1
+
+
+@pytest.mark.parametrize("race", [False, True])
+def test_mirrors(pytester, serve_directory, race):
+    path = pytester_path(pytester)
+    pytester.makepyfile(TEST_FILE)
+    pytester.runpytest("--mpl-generate-path=baseline").assert_outcomes(skipped=4)
+
+    good, _ = serve_directory(path / "baseline")
+    dead = dead_mirror()
+    args = ["--mpl", f"--mpl-baseline-path={dead},{good}", "-p", "no:xdist"]
+    if race:
+        args.append("--mpl-race-mirrors")
+    result = pytester.runpytest(*args)
+    result.assert_outcomes(passed=4)
+    result.stdout.fnmatch_lines([
+        "*pytest-mpl baseline mirrors*",
+        # The tests share a baseline image, which is fetched once, and there is no manifest.json
+        f"{good}: 1 downloaded, 1 not found, 0 failed, 0 skipped*",
+    ])
+    if race:  # The dead mirror is raced (the number of attempts depends on thread timing)
+        result.stdout.fnmatch_lines([f"{dead}: 0 downloaded, 0 not found, * failed*"])
+    else:  # The dead mirror is only tried until the working mirror has responded
+        result.stdout.fnmatch_lines([f"{dead}: 0 downloaded, 0 not found, 1 failed, 0 skipped*"])
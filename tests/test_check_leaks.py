@@ -0,0 +1,94 @@
+import json
+
+import matplotlib.pyplot as plt
+import pytest
+from helpers import pytester_path
+
+TEST_FILE = """
+import matplotlib.pyplot as plt
+import pytest
+
+@pytest.mark.mpl_image_compare
+def test_leak():
+    plt.figure()
+    plt.figure()
+    fig, ax = plt.subplots()
+    return fig
+
+@pytest.mark.mpl_image_compare
+def test_no_leak():
+    fig, ax = plt.subplots()
+    return fig
+
+@pytest.mark.mpl_image_compare
+def test_leak_then_error():
+    plt.figure()
+    raise ValueError("error")
+
+def test_all_closed():
+    assert plt.get_fignums() == []
+"""
+
+
+@pytest.mark.parametrize("mode", ["warn", "fail"])
+def test_check_leaks(pytester, mode):
+    path = pytester_path(pytester)
+    pytester.makepyfile(test_leaks=TEST_FILE)
+    options = ["--mpl-check-leaks"] if mode == "warn" else ["--mpl-check-leaks", "--mpl-check-leaks-mode=fail"]
+    result = pytester.runpytest("--mpl-generate-path=baseline", *options, "--mpl-generate-summary=json",
+                                f"--mpl-results-path={path / 'results'}", "-p", "no:xdist", "-W", "default")
+    if mode == "warn":
+        result.assert_outcomes(passed=1, skipped=2, failed=1)
+        result.stdout.fnmatch_lines(["*UserWarning: test_leaks.test_leak left 2 figure(s) open*"])
+    else:
+        result.assert_outcomes(passed=1, skipped=1, failed=2)
+        result.stdout.fnmatch_lines(["*test_leaks.test_leak left 2 figure(s) open*"])
+    result.stdout.fnmatch_lines([
+        "*pytest-mpl leaked figures*",
+        "test_leaks.test_leak: 2 figure(s) left open",
+        "test_leaks.test_leak_then_error: 1 figure(s) left open",
+        "3 figure(s) left open by 2 test(s)",
+    ])
+
+    with open(path / "results" / "results.json") as fp:
+        results = json.load(fp)
+    assert {name: summary["leaked_figures"] for name, summary in results.items()} == {
+        "test_leaks.test_leak": 2,
+        "test_leaks.test_no_leak": 0,
+        "test_leaks.test_leak_then_error": 1,
+    }
+
+
+def test_check_leaks_disabled(pytester):
+    path = pytester_path(pytester)
+    pytester.makepyfile(test_leaks=TEST_FILE)
+    result = pytester.runpytest("--mpl-generate-path=baseline", "--mpl-generate-summary=json",
+                                f"--mpl-results-path={path / 'results'}", "-p", "no:xdist")
+    result.assert_outcomes(skipped=2, failed=2)
+    plt.close("all")  # Figures are left open without the check
+    with open(path / "results" / "results.json") as fp:
+        assert all("leaked_figures" not in summary for summary in json.load(fp).values())
+
+
+def test_option_before_path(pytester):
+    """
+    The option doesn't take a value, so it can be followed by a test path.
+    """
+    pytester.makepyfile(test_leaks=TEST_FILE)
+    result = pytester.runpytest("--mpl-generate-path=baseline", "--mpl-check-leaks", "test_leaks.py",
+                                "-p", "no:xdist", "-W", "default")
+    result.assert_outcomes(passed=1, skipped=2, failed=1)
+
+
+def test_ini(pytester):
+    pytester.makeini("[pytest]\nmpl-check-leaks = true\nmpl-check-leaks-mode = fail\n")
+    pytester.makepyfile(test_leaks=TEST_FILE)
+    result = pytester.runpytest("--mpl-generate-path=baseline", "-p", "no:xdist")
+    result.assert_outcomes(passed=1, skipped=1, failed=2)
+
+
+def test_unsupported_mode(pytester):
+    pytester.makeini("[pytest]\nmpl-check-leaks = true\nmpl-check-leaks-mode = always\n")
+    pytester.makepyfile(test_leaks=TEST_FILE)
+    result = pytester.runpytest("--mpl")
+    result.stderr.fnmatch_lines(["*The mpl leak check mode 'always' is not supported*"])
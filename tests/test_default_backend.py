@@ -1,5 +1,8 @@
+import matplotlib
 import pytest
 
+ORIGINAL_BACKEND = matplotlib.get_backend().lower()
+
 
 @pytest.mark.parametrize(
     "ini, cli, kwarg, expected",
@@ -33,3 +36,66 @@ def test_config(pytester, ini, cli, kwarg, expected):
     result = pytester.runpytest("--mpl", cli)
     result.assert_outcomes(failed=1)
     result.stdout.re_match_lines([f".*(ModuleNotFound|Value)Error: .*{expected}.*"])
+
+
+@pytest.mark.parametrize("sticky", [False, True])
+def test_sticky_backend(pytester, sticky):
+    pytester.makeconftest(
+        """
+        import matplotlib.pyplot as plt
+        import pytest
+
+        calls = []
+
+        @pytest.fixture(scope="session", autouse=True)
+        def count_backend_switches():
+            switch_backend = plt.switch_backend
+            def counting_switch_backend(backend):
+                calls.append(backend.lower())
+                switch_backend(backend)
+            plt.switch_backend = counting_switch_backend
+            yield
+            plt.switch_backend = switch_backend
+        """
+    )
+    pytester.makepyfile(
+        """
+        import matplotlib
+        import matplotlib.pyplot as plt
+        import pytest
+        from conftest import calls
+
+        ORIGINAL_BACKEND = matplotlib.get_backend().lower()
+
+        def plot():
+            assert matplotlib.get_backend().lower() == "pdf"
+            fig, ax = plt.subplots()
+            ax.plot([1, 2, 3])
+            return fig
+
+        @pytest.mark.mpl_image_compare(backend="pdf")
+        def test_pdf_1():
+            return plot()
+
+        @pytest.mark.mpl_image_compare(backend="pdf")
+        def test_pdf_2():
+            return plot()
+
+        def test_unmarked(request):
+            assert matplotlib.get_backend().lower() == ORIGINAL_BACKEND
+            if request.config.getoption("--mpl-sticky-backend"):
+                assert calls == ["pdf", ORIGINAL_BACKEND]
+            else:
+                assert calls == ["pdf", ORIGINAL_BACKEND, "pdf", ORIGINAL_BACKEND]
+
+        @pytest.mark.mpl_image_compare(backend="pdf")
+        def test_pdf_3():
+            return plot()
+        """
+    )
+    args = ["--mpl-generate-path=baseline", "-p", "no:xdist"]
+    if sticky:
+        args.append("--mpl-sticky-backend")
+    result = pytester.runpytest(*args)
+    result.assert_outcomes(passed=1, skipped=3)
+    assert matplotlib.get_backend().lower() == ORIGINAL_BACKEND
@@ -1,6 +1,12 @@
+import pickle
+
+import matplotlib
+import matplotlib.pyplot as plt
 import pytest
 from helpers import pytester_path
 
+from pytest_mpl.plugin import style_context
+
 
 @pytest.mark.parametrize(
     "ini, cli, kwarg, expected",
@@ -36,3 +42,26 @@ def test_config(pytester, ini, cli, kwarg, expected):
     result = pytester.runpytest("--mpl", cli)
     result.assert_outcomes(failed=1)
     result.stdout.fnmatch_lines([f"*OSError: *'{expected}'*"])
+
+
+@pytest.mark.parametrize("style", [
+    "classic",
+    "default",
+    "ggplot",
+    {"lines.linewidth": 3, "axes.grid": True},
+    ["classic", "dark_background", {"font.size": 7}],
+])
+def test_style_context(style):
+    """
+    The cached style context sets exactly the same rcParams as ``plt.style.context``.
+    """
+    cache = {}
+    with matplotlib.rc_context({"lines.linewidth": 10, "interactive": True}):
+        with plt.style.context(style, after_reset=True):
+            expected = pickle.dumps(dict(sorted(matplotlib.rcParams.items())))
+        for _ in range(2):  # Resolved, then from the cache
+            with style_context(style, cache):
+                assert pickle.dumps(dict(sorted(matplotlib.rcParams.items()))) == expected
+                matplotlib.rcParams["lines.linewidth"] = 5  # Changes made by the test are reverted
+        assert matplotlib.rcParams["lines.linewidth"] == 10
+    assert list(cache) == [repr(style)]
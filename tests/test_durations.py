@@ -0,0 +1,39 @@
+import pytest
+from helpers import FAKE_CLOCK_CONFTEST
+
+TEST_FILE = """
+import matplotlib.pyplot as plt
+import pytest
+@pytest.mark.parametrize("delay", [0, 0.5, 0.01])
+@pytest.mark.mpl_image_compare
+def test_mpl(delay, clock):
+    clock.sleep(delay)
+    fig, ax = plt.subplots()
+    ax.plot([1, 2, 3])
+    return fig
+"""
+
+
+@pytest.mark.parametrize("xdist", [False, True])
+def test_durations(pytester, xdist):
+    pytester.makeconftest(FAKE_CLOCK_CONFTEST)
+    pytester.makepyfile(test_slow=TEST_FILE)
+    args = ["-n", "2"] if xdist else ["-p", "no:xdist"]
+    result = pytester.runpytest("--mpl-generate-path=baseline", "--mpl-durations=2", *args)
+    result.assert_outcomes(skipped=3)
+    result.stdout.fnmatch_lines([
+        "*pytest-mpl slowest 2 figure tests*",
+        "    total     test   render     hash  compare      I/O  test",
+        "   0.500s   0.500s   0.000s   0.000s   0.000s   0.000s  test_slow.test_mpl[[]0.5]",
+        "   0.010s   0.010s   0.000s   0.000s   0.000s   0.000s  test_slow.test_mpl[[]0.01]",
+        "   0.510s   0.510s   0.000s   0.000s   0.000s   0.000s  total of 3 figure tests",
+        "     100%     100%       0%       0%       0%       0%  of the total time",
+    ])
+
+
+def test_durations_disabled(pytester):
+    pytester.makeconftest(FAKE_CLOCK_CONFTEST)
+    pytester.makepyfile(test_slow=TEST_FILE)
+    result = pytester.runpytest("--mpl-generate-path=baseline", "-p", "no:xdist")
+    result.assert_outcomes(skipped=3)
+    result.stdout.no_fnmatch_line("*slowest*")
@@ -0,0 +1,64 @@
+import pytest
+
+TEST_FILE = """
+import matplotlib.pyplot as plt
+import pytest
+from matplotlib.backend_bases import FigureCanvasBase
+
+KEPT = []
+
+def plot():
+    fig, ax = plt.subplots()
+    ax.plot([1, 2, 3])
+    return fig
+
+@pytest.mark.mpl_image_compare
+def test_released():
+    return plot()
+
+@pytest.mark.mpl_image_compare
+def test_kept():
+    fig = plot()
+    KEPT.append(fig)
+    return fig
+
+def test_check(request):
+    plugin, = [p for p in request.config.pluginmanager.get_plugins() if hasattr(p, "return_value")]
+    assert plugin.return_value == {}
+    assert plt.get_fignums() == []
+    # The renderer of a figure which is still referenced has been dropped
+    assert type(KEPT[0].canvas) is FigureCanvasBase
+"""
+
+
+@pytest.mark.parametrize("args", [
+    ["--mpl"],
+    ["--mpl-generate-path=baseline"],
+    [],
+])
+def test_figures_released(pytester, args):
+    pytester.makepyfile(test_figures=TEST_FILE)
+    result = pytester.runpytest(*args, "-p", "no:xdist")
+    outcomes = {"passed": 1}
+    if args == ["--mpl"]:
+        outcomes["failed"] = 2  # Missing baseline images
+    elif args:
+        outcomes["skipped"] = 2
+    else:
+        outcomes["passed"] = 3
+    result.assert_outcomes(**outcomes)
+
+
+@pytest.mark.parametrize("generate", [False, True])
+def test_check_released(pytester, generate):
+    pytester.makepyfile(test_figures=TEST_FILE)
+    args = ["--mpl-generate-path=baseline"] if generate else ["--mpl"]
+    result = pytester.runpytest(*args, "--mpl-check-released", "-p", "no:xdist")
+    if generate:
+        result.assert_outcomes(passed=1, skipped=2, errors=1)
+    else:
+        result.assert_outcomes(passed=1, failed=2, errors=1)
+    result.stdout.fnmatch_lines([
+        "*ERROR at teardown of test_kept*",
+        "*The figure returned by test_figures.test_kept is still referenced after the test has finished.*",
+    ])
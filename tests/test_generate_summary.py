@@ -63,3 +63,78 @@ def test_config(pytester, ini, cli, expected):
         assert "test_config.test_mpl" in raw
     else:
         assert not basic_html_summary.exists()
+
+
+def test_xdist(pytester):
+    """
+    Results are sent to the controller with the test reports rather than
+    through per-worker files.
+    """
+    path = pytester_path(pytester)
+    pytester.makepyfile(
+        """
+        import matplotlib.pyplot as plt
+        import pytest
+        @pytest.mark.parametrize("i", range(4))
+        @pytest.mark.mpl_image_compare
+        def test_mpl(i):
+            fig, ax = plt.subplots()
+            ax.plot([1, 2, i])
+            return fig
+        """
+    )
+    result = pytester.runpytest("--mpl", f"--mpl-results-path={path / 'results'}",
+                                "--mpl-generate-summary=json",
+                                f"--mpl-generate-hash-library={path / 'hashes.json'}", "-n", "2")
+    result.assert_outcomes(failed=4)
+
+    with open(path / "results" / "results.json") as fp:
+        results = json.load(fp)
+    assert sorted(results) == [f"test_xdist.test_mpl[{i}]" for i in range(4)]
+    assert all(summary["status"] == "failed" for summary in results.values())
+    with open(path / "hashes.json") as fp:
+        assert sorted(json.load(fp)) == sorted(results)
+    assert sorted(p.name for p in (path / "results").glob("*.json")) == ["results.json"]
+
+
+@pytest.mark.parametrize("mode", ["image", "hash"])
+def test_timings(pytester, mode):
+    path = pytester_path(pytester)
+    pytester.makepyfile(
+        """
+        import time
+        import matplotlib.pyplot as plt
+        import pytest
+        @pytest.mark.mpl_image_compare(remove_text=True, hash_library="hashes.json", deterministic=True)
+        def test_mpl():
+            time.sleep(0.05)
+            fig, ax = plt.subplots()
+            ax.plot([1, 2, 3])
+            return fig
+        """
+    )
+    pytester.runpytest("--mpl-generate-path=baseline", f"--mpl-generate-hash-library={path / 'hashes.json'}")
+    args = ["--mpl", f"--mpl-results-path={path / 'results'}", "--mpl-generate-summary=json,html,basic-html"]
+    if mode == "image":
+        args.append("--mpl-baseline-path=baseline")
+    result = pytester.runpytest(*args, "-p", "no:xdist")
+    result.assert_outcomes(passed=1)
+
+    with open(path / "results" / "results.json") as fp:
+        timings = json.load(fp)["test_timings.test_mpl"]["timings"]
+    assert list(timings) == ["test", "remove_text", "savefig", "hash", "baseline_fetch", "compare", "artifacts"]
+    assert timings["test"] >= 0.05
+    assert timings["remove_text"] > 0
+    assert timings["savefig"] > 0
+    if mode == "image":
+        assert timings["compare"] > 0
+    else:
+        assert timings["hash"] > 0
+        assert timings["compare"] == 0
+
+    html = (path / "results" / "fig_comparison.html").read_text()
+    assert 'data-sort="total-time-sort"' in html
+    assert 'data-sort="remove-text-time-sort"' in html
+    assert '<span class="savefig-time-sort" style="display:none">' in html
+    assert "Time taken" in html
+    assert "Time: " in (path / "results" / "fig_comparison_basic.html").read_text()
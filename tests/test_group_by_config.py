@@ -0,0 +1,78 @@
+import pytest
+
+TEST_FILE = """
+import matplotlib.pyplot as plt
+import pytest
+
+def plot():
+    fig, ax = plt.subplots()
+    ax.plot([1, 2, 3])
+    return fig
+
+@pytest.mark.mpl_image_compare(backend="pdf")
+def test_pdf_1():
+    return plot()
+
+@pytest.mark.mpl_image_compare
+def test_agg_1():
+    return plot()
+
+def test_unmarked():
+    pass
+
+@pytest.mark.mpl_image_compare(backend="pdf")
+def test_pdf_2():
+    return plot()
+
+@pytest.mark.mpl_image_compare(style="default")
+def test_agg_default_style():
+    return plot()
+
+@pytest.mark.mpl_image_compare
+def test_agg_2():
+    return plot()
+
+class TestClass:
+    @pytest.mark.mpl_image_compare(savefig_kwargs={"format": "svg"})
+    def test_svg(self):
+        return plot()
+
+    @pytest.mark.mpl_image_compare
+    def test_png(self):
+        return plot()
+
+@pytest.mark.mpl_image_compare(backend="pdf")
+def test_pdf_3():
+    return plot()
+"""
+
+
+@pytest.mark.parametrize("group_by_config", [False, True])
+def test_collection_order(pytester, group_by_config):
+    pytester.makepyfile(test_order=TEST_FILE)
+    args = ["--mpl", "--collect-only", "-q"]
+    if group_by_config:
+        args.append("--mpl-group-by-config")
+    result = pytester.runpytest(*args)
+    names = [line.split("::", 1)[1] for line in result.outlines if "::" in line]
+    if group_by_config:
+        assert names == [
+            "test_unmarked", "test_agg_1", "test_agg_2", "test_agg_default_style", "test_pdf_1", "test_pdf_2",
+            # Items are not moved in or out of the class
+            "TestClass::test_png", "TestClass::test_svg",
+            "test_pdf_3",
+        ]
+    else:
+        assert names == [
+            "test_pdf_1", "test_agg_1", "test_unmarked", "test_pdf_2", "test_agg_default_style", "test_agg_2",
+            "TestClass::test_svg", "TestClass::test_png",
+            "test_pdf_3",
+        ]
+
+
+def test_xdist_loadgroup(pytester):
+    pytester.makepyfile(test_order=TEST_FILE)
+    result = pytester.runpytest("--mpl-generate-path=baseline", "--mpl-group-by-config",
+                                "-n", "2", "--dist", "loadgroup", "-v")
+    result.assert_outcomes(passed=1, skipped=8)
+    result.stdout.fnmatch_lines(["*test_order.py::test_pdf_1@mpl:test_order.py:pdf:'classic':png*"])
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+from helpers import pytester_path
+
+TEST_FILE = """
+import matplotlib.pyplot as plt
+import pytest
+@pytest.mark.parametrize("i", range(2))
+@pytest.mark.mpl_image_compare
+def test_mpl(i):
+    fig, ax = plt.subplots()
+    ax.plot([1, 2, i])
+    return fig
+@pytest.mark.mpl_image_compare
+def test_error():
+    raise ValueError("no figure")
+"""
+
+CONFTEST = """
+import json
+
+def record(*event):
+    with open("events.jsonl", "a") as f:
+        f.write(json.dumps(event) + "\\n")
+
+def pytest_mpl_figure_rendered(item, fig, data):
+    record("rendered", item.name, data[:4].decode("latin-1"))
+
+def pytest_mpl_baseline_missing(item):
+    record("missing", item.name)
+
+def pytest_mpl_comparison_result(item, summary):
+    record("result", item.name, summary["status"])
+"""
+
+
+def read_events(path):
+    with open(path / "events.jsonl") as f:
+        return [tuple(json.loads(line)) for line in f]
+
+
+@pytest.mark.parametrize("mode", ["image", "hash"])
+def test_hooks(pytester, mode):
+    path = pytester_path(pytester)
+    pytester.makepyfile(test_hooked=TEST_FILE)
+    pytester.runpytest("--mpl-generate-path=baseline", "-k", "test_mpl and 0",
+                       "--mpl-generate-hash-library=hashes.json", "--mpl-deterministic")
+    pytester.makeconftest(CONFTEST)
+    args = ["--mpl-baseline-path=baseline"] if mode == "image" else ["--mpl-hash-library=hashes.json"]
+    result = pytester.runpytest("--mpl", "--mpl-deterministic", "-p", "no:xdist", *args)
+    result.assert_outcomes(passed=1, failed=2)
+
+    # In hash mode, the figure is saved once to be hashed and again as the result image
+    renders = 1 if mode == "image" else 2
+    assert read_events(path) == [
+        *[("rendered", "test_mpl[0]", "\x89PNG")] * renders,
+        ("result", "test_mpl[0]", "passed"),
+        *[("rendered", "test_mpl[1]", "\x89PNG")] * renders,
+        ("missing", "test_mpl[1]"),
+        ("result", "test_mpl[1]", "failed"),
+        ("result", "test_error", "failed"),
+    ]
+
+
+def test_hooks_generate(pytester):
+    """
+    Images which are rendered into memory for the hooks are still written to disk.
+    """
+    path = pytester_path(pytester)
+    pytester.makepyfile(test_hooked=TEST_FILE)
+    pytester.makeconftest(CONFTEST)
+    result = pytester.runpytest("--mpl-generate-path=baseline", "-k", "test_mpl", "-p", "no:xdist")
+    result.assert_outcomes(skipped=2)
+    assert (path / "baseline" / "test_mpl_0.png").read_bytes().startswith(b"\x89PNG")
+    assert read_events(path)[:2] == [("rendered", "test_mpl[0]", "\x89PNG"), ("result", "test_mpl[0]", "skipped")]
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+from helpers import pytester_path
+
+TEST_FILE = """
+import matplotlib.pyplot as plt
+import pytest
+def test_unmarked():
+    pass
+@pytest.mark.parametrize("i", range(4))
+@pytest.mark.mpl_image_compare(deterministic=True)
+def test_mpl(i):
+    fig, ax = plt.subplots()
+    ax.plot([1, 2, {last}])
+    return fig
+"""
+
+NEW_TEST = """
+@pytest.mark.mpl_image_compare(deterministic=True)
+def test_new():
+    fig, ax = plt.subplots()
+    ax.plot([3, 2, 1])
+    return fig
+"""
+
+
+@pytest.mark.parametrize("xdist", [False, True])
+@pytest.mark.parametrize("mode", ["image", "hash"])
+def test_last_failed(pytester, mode, xdist):
+    path = pytester_path(pytester)
+    pytester.makepyfile(test_failing=TEST_FILE.format(last="i"))
+    if mode == "image":
+        pytester.runpytest("--mpl-generate-path=baseline", "-p", "no:xdist")
+        mode_args = ["--mpl-baseline-path=baseline"]
+    else:
+        pytester.runpytest("--mpl-generate-hash-library=hashes.json", "-p", "no:xdist")
+        mode_args = ["--mpl-hash-library=hashes.json"]
+    args = ["--mpl", *mode_args, *(["-n", "2"] if xdist else ["-p", "no:xdist"])]
+    # Items deselected by the xdist workers aren't counted by the controller
+    deselected = {} if xdist else {"deselected": 3}
+    outcomes_path = path / ".pytest_cache" / "v" / "pytest-mpl" / "last-outcomes"
+
+    # test_mpl[2] fails, and test_new has no baseline
+    pytester.makepyfile(test_failing=TEST_FILE.format(last="i if i != 2 else 0") + NEW_TEST)
+    pytester.runpytest(*args).assert_outcomes(passed=4, failed=2)
+    with open(outcomes_path) as fp:
+        outcomes = json.load(fp)
+    # Only the failures are stored
+    assert sorted(outcomes) == ["test_failing.test_mpl[2]", "test_failing.test_new"]
+    assert outcomes["test_failing.test_mpl[2]"]["status"] == "failed"
+    assert outcomes["test_failing.test_new"][f"{mode}_status"] == "missing"
+
+    # Tests without the marker are not deselected
+    result = pytester.runpytest(*args, "--mpl-last-failed", "-v")
+    result.assert_outcomes(passed=1, failed=2, **deselected)
+    assert any("test_unmarked" in line and "PASSED" in line for line in result.outlines)
+    result.stdout.fnmatch_lines(["mpl-last-failed: rerun 2 previously failed figure tests (deselected 3 items)."])
+
+    result = pytester.runpytest(*args, "--mpl-failed-first", "-v")
+    result.assert_outcomes(passed=4, failed=2)
+    if not xdist:
+        result.stdout.fnmatch_lines(["*test_mpl?2?*", "*test_new*", "*test_unmarked*", "*test_mpl?0?*"])
+
+    # Once fixed, the test passes and is no longer run by --mpl-last-failed, and
+    # the outcome of test_new is forgotten once it is removed
+    pytester.makepyfile(test_failing=TEST_FILE.format(last="i"))
+    pytester.runpytest(*args, "--mpl-last-failed").assert_outcomes(passed=2, **deselected)
+    with open(outcomes_path) as fp:
+        assert json.load(fp) == {}
+    result = pytester.runpytest(*args, "--mpl-last-failed")
+    result.assert_outcomes(passed=5)
+    result.stdout.fnmatch_lines(["mpl-last-failed: no previously failed figure tests, not deselecting items."])
@@ -0,0 +1,67 @@
+import re
+
+import pytest
+from helpers import pytester_path
+
+from pytest_mpl.metrics import generate_metrics
+
+TEST_FILE = """
+import matplotlib.pyplot as plt
+import pytest
+@pytest.mark.parametrize("i", range(3))
+@pytest.mark.mpl_image_compare
+def test_mpl(i):
+    fig, ax = plt.subplots()
+    ax.plot([1, 2, {last}])
+    return fig
+"""
+
+
+def parse_metrics(text):
+    samples = {}
+    for line in text.splitlines():
+        if not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_generate_metrics():
+    summary = {"status": "failed", "image_status": "diff", "hash_status": None, "rms": 12.5,
+               "timings": {"savefig": 0.2, "remove_text": 0.1, "compare": 0.02}}
+    results = {"a": summary, "b": {**summary, "status": "passed", "image_status": "match", "rms": None}}
+    mirror_stats = {"https://example.com/": {"successes": 4, "misses": 1, "failures": 2}}
+    text = generate_metrics(results, mirror_stats=mirror_stats, manifest_hits=3, written_bytes=1024)
+    assert "# TYPE pytest_mpl_render_duration_seconds histogram" in text
+    samples = parse_metrics(text)
+    assert samples['pytest_mpl_tests_total{status="failed",image_status="diff",hash_status=""}'] == 1
+    assert samples['pytest_mpl_tests_total{status="passed",image_status="match",hash_status=""}'] == 1
+    assert samples['pytest_mpl_render_duration_seconds_bucket{le="0.25"}'] == 0
+    assert samples['pytest_mpl_render_duration_seconds_bucket{le="0.5"}'] == 2
+    assert samples['pytest_mpl_render_duration_seconds_sum'] == pytest.approx(0.6)
+    assert samples['pytest_mpl_compare_duration_seconds_count'] == 2
+    assert samples['pytest_mpl_rms_bucket{le="20"}'] == 1
+    assert samples['pytest_mpl_rms_count'] == 1
+    assert samples['pytest_mpl_baseline_downloads_total{mirror="https://example.com/",result="failed"}'] == 2
+    assert samples['pytest_mpl_baseline_manifest_hits_total'] == 3
+    assert samples['pytest_mpl_written_bytes_total'] == 1024
+
+
+@pytest.mark.parametrize("xdist", [False, True])
+def test_metrics_file(pytester, xdist):
+    path = pytester_path(pytester)
+    pytester.makepyfile(test_measured=TEST_FILE.format(last="i"))
+    pytester.runpytest("--mpl-generate-path=baseline").assert_outcomes(skipped=3)
+    pytester.makepyfile(test_measured=TEST_FILE.format(last="min(i, 1)"))
+    args = ["-n", "2"] if xdist else ["-p", "no:xdist"]
+    result = pytester.runpytest("--mpl", "--mpl-baseline-path=baseline", "--mpl-metrics-file=metrics/mpl.prom",
+                                f"--mpl-results-path={path / 'results'}", *args)
+    result.assert_outcomes(passed=2, failed=1)
+
+    samples = parse_metrics((path / "metrics" / "mpl.prom").read_text())
+    assert samples['pytest_mpl_tests_total{status="passed",image_status="match",hash_status=""}'] == 2
+    assert samples['pytest_mpl_tests_total{status="failed",image_status="diff",hash_status=""}'] == 1
+    assert samples['pytest_mpl_render_duration_seconds_count'] == 3
+    assert samples['pytest_mpl_rms_count'] >= 1
+    assert samples['pytest_mpl_written_bytes_total'] > 0
+    assert not [p for p in (path / "metrics").iterdir() if re.search(r"\.tmp$", p.name)]
@@ -0,0 +1,84 @@
+import json
+import pstats
+
+import pytest
+from helpers import FAKE_CLOCK_CONFTEST, pytester_path
+
+TEST_FILE = """
+import matplotlib.pyplot as plt
+import pytest
+@pytest.mark.parametrize("delay", [0.5, 0])
+@pytest.mark.mpl_image_compare
+def test_mpl(delay, clock):
+    clock.sleep(delay)
+    fig, ax = plt.subplots()
+    ax.plot([1, 2, 3])
+    return fig
+"""
+
+
+@pytest.mark.parametrize("xdist", [False, True])
+def test_profile(pytester, xdist):
+    path = pytester_path(pytester)
+    pytester.makeconftest(FAKE_CLOCK_CONFTEST)
+    pytester.makepyfile(test_profiled=TEST_FILE)
+    pytester.runpytest("--mpl-generate-path=baseline").assert_outcomes(skipped=2)
+    args = ["-n", "2"] if xdist else ["-p", "no:xdist"]
+    result = pytester.runpytest("--mpl", "--mpl-baseline-path=baseline", "--mpl-profile",
+                                f"--mpl-results-path={path / 'results'}",
+                                "--mpl-generate-summary=json,html,basic-html", *args)
+    result.assert_outcomes(passed=2)
+
+    with open(path / "results" / "results.json") as fp:
+        results = json.load(fp)
+    for delay in ["0.5", "0"]:
+        profile = results[f"test_profiled.test_mpl[{delay}]"]["profile"]
+        assert profile == f"test_profiled.test_mpl_{delay}/profile.prof"
+        stats = pstats.Stats(str(path / "results" / profile))
+        functions = {function for _, _, function in stats.stats}
+        assert "savefig" in functions
+        assert "compare_images" in functions
+    assert 'href="test_profiled.test_mpl_0.5/profile.prof"' in (path / "results" / "fig_comparison.html").read_text()
+    assert "Download profile" in (path / "results" / "fig_comparison_basic.html").read_text()
+
+
+def test_profile_threshold(pytester):
+    path = pytester_path(pytester)
+    pytester.makeconftest(FAKE_CLOCK_CONFTEST)
+    pytester.makepyfile(test_profiled=TEST_FILE)
+    result = pytester.runpytest("--mpl-generate-path=baseline", "--mpl-profile", "--mpl-profile-threshold=0.5",
+                                f"--mpl-results-path={path / 'results'}", "--mpl-generate-summary=json",
+                                "-p", "no:xdist")
+    result.assert_outcomes(skipped=2)
+
+    # The slow test takes exactly the threshold, so its profile is kept
+    with open(path / "results" / "results.json") as fp:
+        results = json.load(fp)
+    assert results["test_profiled.test_mpl[0]"]["profile"] is None
+    assert results["test_profiled.test_mpl[0.5]"]["profile"] == "test_profiled.test_mpl_0.5/profile.prof"
+    assert [p.parent.name for p in (path / "results").glob("*/profile.prof")] == ["test_profiled.test_mpl_0.5"]
+
+
+def test_profile_disabled(pytester):
+    path = pytester_path(pytester)
+    pytester.makeconftest(FAKE_CLOCK_CONFTEST)
+    pytester.makepyfile(test_profiled=TEST_FILE)
+    result = pytester.runpytest("--mpl-generate-path=baseline", f"--mpl-results-path={path / 'results'}",
+                                "--mpl-generate-summary=json", "-p", "no:xdist")
+    result.assert_outcomes(skipped=2)
+    with open(path / "results" / "results.json") as fp:
+        assert all("profile" not in summary for summary in json.load(fp).values())
+    assert not list((path / "results").glob("*/profile.prof"))
+
+
+def test_profile_before_path(pytester):
+    """
+    The option doesn't take a value, so it can be followed by a test path.
+    """
+    path = pytester_path(pytester)
+    pytester.makeconftest(FAKE_CLOCK_CONFTEST)
+    pytester.makepyfile(test_profiled=TEST_FILE.replace("[0.5, 0]", "[0]"))
+    result = pytester.runpytest("--mpl-generate-path=baseline", "--mpl-profile", "test_profiled.py",
+                                f"--mpl-results-path={path / 'results'}", "-p", "no:xdist")
+    result.assert_outcomes(skipped=1)
+    assert list((path / "results").glob("*/profile.prof"))
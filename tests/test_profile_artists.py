@@ -0,0 +1,83 @@
+import io
+import json
+
+import matplotlib.pyplot as plt
+import numpy as np
+from helpers import pytester_path
+
+from pytest_mpl.draw_profile import DrawProfiler
+
+TEST_FILE = """
+import numpy as np
+import matplotlib.pyplot as plt
+import pytest
+@pytest.mark.mpl_image_compare
+def test_mpl():
+    fig, (ax1, ax2) = plt.subplots(1, 2)
+    ax1.scatter(np.arange(20000), np.arange(20000))
+    ax1.set_title("scatter")
+    ax2.plot([1, 2, 3])
+    return fig
+"""
+
+
+def test_draw_profiler():
+    fig, (ax1, ax2) = plt.subplots(1, 2)
+    ax1.scatter(np.arange(1000), np.arange(1000))
+    ax1.set_title("scatter")
+    ax2.plot([1, 2, 3])
+    ax2.imshow(np.zeros((20, 30)))
+    draw = type(ax2.lines[0]).draw
+    profiler = DrawProfiler()
+    with profiler.profile(fig):
+        fig.savefig(io.BytesIO(), format="png")
+    plt.close(fig)
+    assert type(ax2.lines[0]).draw is draw  # Restored after saving
+
+    results = profiler.results()
+    classes = {stats["name"]: stats for stats in results["classes"]}
+    assert classes["PathCollection"]["calls"] == 1
+    assert classes["PathCollection"]["points"] == 1000
+    assert classes["Line2D"]["vertices"] >= 3
+    assert classes["AxesImage"]["points"] == 600
+    assert classes["Figure"]["calls"] == 1
+    assert classes["Axes"]["calls"] == 2  # Not counted again for calls to Artist.draw
+    times = [stats["time"] for stats in results["classes"]]
+    assert times == sorted(times, reverse=True)
+    assert sorted(axes["name"] for axes in results["axes"]) == ["axes[0] 'scatter'", "axes[1]"]
+
+    top = profiler.results(2)
+    assert top["classes"] == results["classes"][:2]
+
+
+def test_profile_artists(pytester):
+    path = pytester_path(pytester)
+    pytester.makepyfile(test_artists=TEST_FILE)
+    result = pytester.runpytest("--mpl-generate-path=baseline", "--mpl-profile-artists",
+                                "--mpl-profile-artists-count=3", f"--mpl-results-path={path / 'results'}",
+                                "--mpl-generate-summary=json,html", "-p", "no:xdist")
+    result.assert_outcomes(skipped=1)
+
+    with open(path / "results" / "results.json") as fp:
+        artists = json.load(fp)["test_artists.test_mpl"]["artists"]
+    assert len(artists["classes"]) == 3
+    assert "PathCollection" in [stats["name"] for stats in artists["classes"]]
+    assert artists["axes"][0]["name"] == "axes[0] 'scatter'"
+    html = (path / "results" / "fig_comparison.html").read_text()
+    assert "Slowest artists" in html
+    assert "<td>PathCollection</td>" in html
+
+
+def test_profile_artists_before_path(pytester):
+    """
+    The option doesn't take a value, so it can be followed by a test path, and records 10 classes by default.
+    """
+    path = pytester_path(pytester)
+    pytester.makepyfile(test_artists=TEST_FILE)
+    result = pytester.runpytest("--mpl-generate-path=baseline", "--mpl-profile-artists", "test_artists.py",
+                                f"--mpl-results-path={path / 'results'}", "--mpl-generate-summary=json",
+                                "-p", "no:xdist")
+    result.assert_outcomes(skipped=1)
+    with open(path / "results" / "results.json") as fp:
+        artists = json.load(fp)["test_artists.test_mpl"]["artists"]
+    assert len(artists["classes"]) == 10
@@ -0,0 +1,94 @@
+import json
+
+from helpers import pytester_path
+
+TEST_FILE = """
+import matplotlib.pyplot as plt
+import pytest
+def plot():
+    fig, ax = plt.subplots()
+    ax.plot([1, 2, 3])
+    return fig
+@pytest.mark.mpl_image_compare(max_render_time=1e-6)
+def test_slow():
+    return plot()
+@pytest.mark.mpl_image_compare(max_render_time=60)
+def test_fast():
+    return plot()
+@pytest.mark.mpl_image_compare
+def test_default():
+    return plot()
+"""
+
+
+def run(pytester, *args):
+    path = pytester_path(pytester)
+    pytester.makepyfile(test_budgets=TEST_FILE)
+    pytester.runpytest("--mpl-generate-path=baseline").assert_outcomes(skipped=3)
+    result = pytester.runpytest("--mpl", "--mpl-baseline-path=baseline", f"--mpl-results-path={path / 'results'}",
+                                "--mpl-generate-summary=json,html", "-p", "no:xdist", *args)
+    with open(path / "results" / "results.json") as fp:
+        return result, json.load(fp)
+
+
+def test_render_time_fail(pytester):
+    result, results = run(pytester)
+    result.assert_outcomes(passed=2, failed=1)
+    result.stdout.fnmatch_lines([
+        "*Saving the figure of test_budgets.test_slow took longer than its budget*",
+        "*Render time: *s",
+        "*Budget: 0.000s",
+    ])
+    assert results["test_budgets.test_slow"]["render_time"]["status"] == "exceeded"
+    assert results["test_budgets.test_slow"]["render_time"]["time"] > 0
+    assert results["test_budgets.test_fast"]["render_time"] == {
+        "time": results["test_budgets.test_fast"]["render_time"]["time"], "budget": 60, "status": "within",
+    }
+    assert "render_time" not in results["test_budgets.test_default"]
+
+
+def test_render_time_warn(pytester):
+    result, results = run(pytester, "--mpl-render-time-mode=warn", "-W", "default")
+    result.assert_outcomes(passed=3)
+    result.stdout.fnmatch_lines(["*UserWarning: Error: Saving the figure of test_budgets.test_slow took longer*"])
+    assert results["test_budgets.test_slow"]["status"] == "passed"
+    assert results["test_budgets.test_slow"]["render_time"]["status"] == "exceeded"
+
+
+def test_render_time_default_and_factor(pytester):
+    pytester.makeini("[pytest]\nmpl-default-max-render-time = 2\nmpl-render-time-factor = 1.5\n")
+    result, results = run(pytester)
+    result.assert_outcomes(passed=2, failed=1)
+    assert results["test_budgets.test_default"]["render_time"]["budget"] == 3
+    assert results["test_budgets.test_fast"]["render_time"]["budget"] == 90
+    result, results = run(pytester, "--mpl-render-time-factor=1e9")
+    result.assert_outcomes(passed=3)
+
+
+def test_render_time_profile_artists(pytester):
+    """
+    Budgets aren't checked while the draw of each artist is profiled, which slows down savefig.
+    """
+    result, results = run(pytester, "--mpl-profile-artists")
+    result.assert_outcomes(passed=3)
+    assert "render_time" not in results["test_budgets.test_slow"]
+
+
+def test_render_time_invalid_mode(pytester):
+    pytester.makeini("[pytest]\nmpl-render-time-mode = ignore\n")
+    pytester.makepyfile(test_budgets=TEST_FILE)
+    result = pytester.runpytest("--mpl", "-p", "no:xdist")
+    result.stderr.fnmatch_lines(["*The mpl render time mode 'ignore' is not supported*"])
+
+
+def test_render_time_zero(pytester):
+    """
+    A value of 0 on the command line overrides the INI value, rather than being ignored.
+    """
+    pytester.makeini("[pytest]\nmpl-default-max-render-time = 60\nmpl-render-time-factor = 1e9\n")
+    result, results = run(pytester, "--mpl-render-time-factor=0")
+    result.assert_outcomes(failed=3)
+    assert results["test_budgets.test_fast"]["render_time"]["budget"] == 0
+    result, results = run(pytester, "--mpl-render-time-factor=1", "--mpl-default-max-render-time=0")
+    result.assert_outcomes(passed=1, failed=2)
+    assert results["test_budgets.test_default"]["render_time"]["budget"] == 0
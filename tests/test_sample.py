@@ -0,0 +1,71 @@
+import re
+
+import pytest
+
+TEST_FILE = """
+import matplotlib.pyplot as plt
+import pytest
+def test_unmarked():
+    pass
+@pytest.mark.parametrize("i", range({n_tests}))
+@pytest.mark.mpl_image_compare(deterministic=True)
+def test_mpl(i):
+    fig, ax = plt.subplots()
+    ax.plot([1, 2, i])
+    return fig
+"""
+
+
+def run_sample(pytester, *args):
+    result = pytester.runpytest("--mpl", "-p", "no:xdist", "-v", *args)
+    return sorted(set(re.findall(r"::(test_\w+(?:\[\d+\])?) ", "\n".join(result.outlines)))), result
+
+
+@pytest.mark.parametrize("by_module", [False, True])
+def test_sample(pytester, by_module):
+    pytester.makepyfile(test_a=TEST_FILE.format(n_tests=40), test_b=TEST_FILE.format(n_tests=2))
+    pytester.runpytest("--mpl-generate-path=baseline", "-p", "no:xdist").assert_outcomes(passed=2, skipped=42)
+    args = ["--mpl-baseline-path=baseline", "--mpl-sample=0.25", *(["--mpl-sample-by-module"] if by_module else [])]
+
+    selected, result = run_sample(pytester, *args)
+    assert "test_unmarked" in selected
+    n_selected = len(selected) - 1
+    if by_module:
+        # 10 of the 40 tests of test_a.py and 1 of the 2 tests of test_b.py
+        result.assert_outcomes(passed=13, deselected=31)
+        assert n_selected == 11
+    else:
+        assert 0 < n_selected < 42
+        result.assert_outcomes(passed=n_selected + 2, deselected=42 - n_selected)
+    result.stdout.fnmatch_lines([
+        f"mpl-sample: 25% of figure tests (seed 0{', by module' if by_module else ''})",
+        f"mpl-sample: selected {n_selected} of 42 figure tests (deselected {42 - n_selected} items).",
+    ])
+
+    # The sample is stable, and changes with the seed
+    assert run_sample(pytester, *args)[0] == selected
+    assert run_sample(pytester, *args, "--mpl-sample-seed=1")[0] != selected
+
+    # Each xdist worker selects the same sample
+    result = pytester.runpytest("--mpl", *args, "-n", "2")
+    result.assert_outcomes(passed=n_selected + 2)
+    result.stdout.fnmatch_lines([
+        "mpl-sample: 25% of figure tests*",
+        f"mpl-sample: selected {n_selected} of 42 figure tests (deselected {42 - n_selected} items).",
+    ])
+
+
+def test_sample_stable_when_tests_added(pytester):
+    pytester.makepyfile(test_a=TEST_FILE.format(n_tests=20))
+    pytester.runpytest("--mpl-generate-path=baseline", "-p", "no:xdist")
+    selected, _ = run_sample(pytester, "--mpl-baseline-path=baseline", "--mpl-sample=0.5")
+    pytester.makepyfile(test_a=TEST_FILE.format(n_tests=40))
+    selected_after, _ = run_sample(pytester, "--mpl-baseline-path=baseline", "--mpl-sample=0.5")
+    assert set(selected) <= set(selected_after)
+
+
+def test_sample_invalid(pytester):
+    pytester.makepyfile(test_a=TEST_FILE.format(n_tests=2))
+    result = pytester.runpytest("--mpl", "--mpl-sample=1.5", "-p", "no:xdist")
+    assert result.ret != 0
+    result.stderr.fnmatch_lines(["*The mpl sample fraction '1.5' is not supported*"])
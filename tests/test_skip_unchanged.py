@@ -0,0 +1,86 @@
+import json
+
+import pytest
+from helpers import pytester_path
+
+TEST_FILE = """
+import matplotlib.pyplot as plt
+import pytest
+import plotting
+@pytest.mark.parametrize("i", range(2))
+@pytest.mark.mpl_image_compare
+def test_mpl(i, tmp_path_factory):
+    with open("calls.txt", "a") as f:
+        f.write(f"test_mpl[{{i}}]\\n")
+    return plotting.plot([1, 2, i])
+@pytest.mark.mpl_image_compare
+def test_other():
+    with open("calls.txt", "a") as f:
+        f.write("test_other\\n")
+    fig, ax = plt.subplots()
+    ax.plot([{other}])
+    return fig
+"""
+
+PLOTTING = """
+import matplotlib.pyplot as plt
+def plot(data):
+    fig, ax = plt.subplots()
+    ax.plot(data{style})
+    return fig
+"""
+
+
+@pytest.mark.parametrize("xdist", [False, True])
+def test_skip_unchanged(pytester, xdist):
+    path = pytester_path(pytester)
+    pytester.makepyfile(test_unchanged=TEST_FILE.format(other="3, 2, 1"), plotting=PLOTTING.format(style=""))
+    pytester.runpytest("--mpl-generate-path=baseline", "-p", "no:xdist").assert_outcomes(skipped=3)
+    args = ["-n", "2"] if xdist else ["-p", "no:xdist"]
+
+    def run(passed=3, failed=0):
+        (path / "calls.txt").unlink(missing_ok=True)
+        result = pytester.runpytest("--mpl", "--mpl-baseline-path=baseline", "--mpl-skip-unchanged", "-rA",
+                                    f"--mpl-results-path={path / 'results'}", "--mpl-generate-summary=json",
+                                    *args)
+        result.assert_outcomes(passed=passed, failed=failed)
+        calls = (path / "calls.txt").read_text().split() if (path / "calls.txt").exists() else []
+        with open(path / "results" / "results.json") as fp:
+            cached = {name.split(".")[-1]: summary["cached"] for name, summary in json.load(fp).items()}
+        return result, sorted(calls), cached
+
+    result, calls, cached = run()
+    assert calls == ["test_mpl[0]", "test_mpl[1]", "test_other"]
+    assert not any(cached.values())
+
+    # Nothing has changed, so the tests aren't run at all
+    result, calls, cached = run()
+    assert calls == []
+    assert all(cached.values())
+    result.stdout.fnmatch_lines(["PASSED (cached) test_unchanged.py::test_other"])
+
+    # A project module imported by the test module has changed
+    pytester.makepyfile(plotting=PLOTTING.format(style=", color='C0'"))
+    result, calls, cached = run()
+    assert calls == ["test_mpl[0]", "test_mpl[1]", "test_other"]
+
+    # The source of one test has changed, and it now fails, so it isn't cached
+    pytester.makepyfile(test_unchanged=TEST_FILE.format(other="3, 2, 0"))
+    for _ in range(2):
+        result, calls, cached = run(passed=2, failed=1)
+        assert calls == ["test_other"]
+        assert cached == {"test_mpl[0]": True, "test_mpl[1]": True, "test_other": False}
+
+    # The baseline image has changed
+    (path / "baseline" / "test_mpl_0.png").write_bytes((path / "baseline" / "test_mpl_1.png").read_bytes())
+    result, calls, cached = run(passed=1, failed=2)
+    assert calls == ["test_mpl[0]", "test_other"]
+
+
+def test_skip_unchanged_disabled(pytester):
+    path = pytester_path(pytester)
+    pytester.makepyfile(test_unchanged=TEST_FILE.format(other="3, 2, 1"), plotting=PLOTTING.format(style=""))
+    pytester.runpytest("--mpl-generate-path=baseline", "-p", "no:xdist").assert_outcomes(skipped=3)
+    for _ in range(2):
+        pytester.runpytest("--mpl", "--mpl-baseline-path=baseline", "-p", "no:xdist").assert_outcomes(passed=3)
+    assert len((path / "calls.txt").read_text().split()) == 9
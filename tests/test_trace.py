@@ -0,0 +1,57 @@
+import json
+
+import pytest
+from helpers import pytester_path
+
+TEST_FILE = """
+import matplotlib.pyplot as plt
+import pytest
+@pytest.mark.parametrize("i", range(4))
+@pytest.mark.mpl_image_compare
+def test_mpl(i):
+    fig, ax = plt.subplots()
+    ax.plot([1, 2, i])
+    return fig
+"""
+
+
+@pytest.mark.parametrize("xdist", [False, True])
+def test_trace(pytester, xdist):
+    path = pytester_path(pytester)
+    pytester.makepyfile(test_traced=TEST_FILE)
+    pytester.runpytest("--mpl-generate-path=baseline").assert_outcomes(skipped=4)
+    args = ["-n", "2"] if xdist else ["-p", "no:xdist"]
+    result = pytester.runpytest("--mpl", "--mpl-baseline-path=baseline", "--mpl-trace=trace.json",
+                                f"--mpl-results-path={path / 'results'}", "--mpl-generate-summary=html",
+                                *args)
+    result.assert_outcomes(passed=4)
+    result.stdout.fnmatch_lines([f"A trace of the test session can be found at: {path / 'trace.json'}"])
+
+    with open(path / "trace.json") as fp:
+        events = json.load(fp)["traceEvents"]
+    process_names = {event["pid"]: event["args"]["name"] for event in events if event["ph"] == "M"}
+    spans = [event for event in events if event["ph"] == "X"]
+    if xdist:
+        assert sorted(process_names.values()) == ["controller", "gw0", "gw1"]
+    else:
+        assert list(process_names.values()) == ["pytest"]
+    assert {event["pid"] for event in spans} == set(process_names)
+
+    tests = {event["name"]: event for event in spans if event["cat"] == "test"}
+    assert sorted(tests) == [f"test_traced.test_mpl[{i}]" for i in range(4)]
+    for event in spans:
+        if event["cat"] == "phase":
+            # Every phase span lies within the span of a test in the same process
+            assert any(test["pid"] == event["pid"] and test["ts"] <= event["ts"]
+                       and event["ts"] + event["dur"] <= test["ts"] + test["dur"]
+                       for test in tests.values())
+    assert {"test", "savefig", "baseline_fetch", "compare"} <= {event["name"] for event in spans}
+    html_summary, = [event for event in spans if event["name"] == "html summary"]
+    assert process_names[html_summary["pid"]] in {"controller", "pytest"}
+
+
+def test_trace_disabled(pytester):
+    path = pytester_path(pytester)
+    pytester.makepyfile(test_traced=TEST_FILE)
+    pytester.runpytest("--mpl-generate-path=baseline", "-p", "no:xdist").assert_outcomes(skipped=4)
+    assert not (path / "trace.json").exists()
@@ -0,0 +1,63 @@
+import json
+
+from helpers import pytester_path
+
+TEST_FILE = """
+import numpy as np
+import matplotlib.pyplot as plt
+import pytest
+def plot():
+    data = np.ones(1_000_000)  # 8 MB
+    fig, ax = plt.subplots(figsize=(8, 8))
+    ax.plot(data[:3])
+    return fig
+@pytest.mark.mpl_image_compare(savefig_kwargs={"dpi": 300})
+def test_unlimited():
+    return plot()
+@pytest.mark.mpl_image_compare(savefig_kwargs={"dpi": 300}, max_memory=1)
+def test_over_budget():
+    return plot()
+@pytest.mark.mpl_image_compare(savefig_kwargs={"dpi": 300}, max_memory=1000)
+def test_within_budget():
+    return plot()
+"""
+
+
+def test_track_memory(pytester):
+    path = pytester_path(pytester)
+    pytester.makepyfile(test_memory=TEST_FILE)
+    pytester.runpytest("--mpl-generate-path=baseline").assert_outcomes(skipped=3)
+    result = pytester.runpytest("--mpl", "--mpl-baseline-path=baseline", "--mpl-track-memory",
+                                f"--mpl-results-path={path / 'results'}", "--mpl-generate-summary=json,html",
+                                "-p", "no:xdist")
+    result.assert_outcomes(passed=2, failed=1)
+    result.stdout.fnmatch_lines([
+        "*Figure test used more memory than its budget*",
+        "*Memory used: * MiB (while in the * phase)*",
+        "*Budget: 1 MiB*",
+    ])
+
+    with open(path / "results" / "results.json") as fp:
+        results = json.load(fp)
+    summary = results["test_memory.test_unlimited"]
+    assert summary["max_memory"] is None
+    assert list(summary["memory"]) == ["test", "render", "compare"]
+    assert summary["memory"]["test"]["peak"] > 8_000_000
+    assert summary["memory"]["render"]["peak"] > 0
+    assert summary["memory"]["compare"]["peak"] > 0
+    assert all(isinstance(usage["rss_delta"], int) for usage in summary["memory"].values())
+    assert results["test_memory.test_over_budget"]["status"] == "failed"
+    assert results["test_memory.test_within_budget"]["status"] == "passed"
+    html = (path / "results" / "fig_comparison.html").read_text()
+    assert "Memory used" in html
+    assert "Budget: 1 MiB" in html
+
+
+def test_track_memory_disabled(pytester):
+    path = pytester_path(pytester)
+    pytester.makepyfile(test_memory=TEST_FILE)
+    result = pytester.runpytest("--mpl-generate-path=baseline", f"--mpl-results-path={path / 'results'}",
+                                "--mpl-generate-summary=json", "-p", "no:xdist")
+    result.assert_outcomes(skipped=3)  # The budget is only checked when tracking memory
+    with open(path / "results" / "results.json") as fp:
+        assert all("memory" not in summary for summary in json.load(fp).values())
@@ -0,0 +1,80 @@
+from helpers import pytester_path
+
+TEST_FILE = """
+import matplotlib.pyplot as plt
+import pytest
+@pytest.mark.parametrize("i", range(2))
+@pytest.mark.mpl_image_compare
+def test_mpl(i):
+    fig, ax = plt.subplots()
+    ax.plot([1, 2, i])
+    return fig
+"""
+
+
+def test_warmup(pytester):
+    pytester.makepyfile(test_figures=TEST_FILE)
+    result = pytester.runpytest("--mpl-generate-path=baseline", "--mpl-warmup", "-p", "no:xdist")
+    result.assert_outcomes(skipped=2)
+    result.stdout.fnmatch_lines(["*pytest-mpl warm-up*", "Warm-up took *s"])
+
+
+USER_CONFIG_TEST_FILE = """
+import matplotlib
+import matplotlib.pyplot as plt
+import pytest
+def test_matplotlibrc():
+    assert matplotlib.rcParams["lines.linewidth"] == 7
+@pytest.mark.mpl_image_compare(style="user-style")
+def test_stylelib():
+    fig, ax = plt.subplots()
+    ax.plot([1, 2, 3])
+    return fig
+"""
+
+
+def test_warmup_xdist(pytester, monkeypatch):
+    monkeypatch.delenv("MPLCONFIGDIR", raising=False)
+    path = pytester_path(pytester)
+    # Matplotlib's configuration directory is in one of these, depending on the platform
+    monkeypatch.setenv("HOME", str(path / "home"))
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(path / "config"))
+    for config_dir in [path / "home" / ".matplotlib", path / "config" / "matplotlib"]:
+        (config_dir / "stylelib").mkdir(parents=True)
+        (config_dir / "matplotlibrc").write_text("lines.linewidth: 7\n")
+        (config_dir / "stylelib" / "user-style.mplstyle").write_text("axes.facecolor: red\n")
+    pytester.makepyfile(test_figures=TEST_FILE, test_user_config=USER_CONFIG_TEST_FILE)
+    pytester.makeconftest("""
+import os
+import pytest
+@pytest.hookimpl(trylast=True)
+def pytest_unconfigure(config):
+    if not hasattr(config, "workerinput"):
+        print("MPLCONFIGDIR after session:", os.environ.get("MPLCONFIGDIR"))
+""")
+    result = pytester.runpytest_subprocess("--mpl-generate-path=baseline", "--mpl-warmup", "-n", "2")
+    # The workers use the user's matplotlibrc and styles
+    result.assert_outcomes(passed=1, skipped=3)
+    result.stdout.fnmatch_lines(["Warm-up took *s over 2 workers (slowest *s)"])
+    # The font cache is built by the controller in the pytest cache directory
+    assert list((path / ".pytest_cache" / "d" / "mpl-warmup").glob("fontlist-*.json"))
+    # MPLCONFIGDIR is only set for the duration of the session
+    result.stdout.fnmatch_lines(["MPLCONFIGDIR after session: None"])
+
+
+def test_warmup_failure(pytester):
+    pytester.makepyfile(test_figures=TEST_FILE)
+    result = pytester.runpytest("--mpl-generate-path=baseline", "--mpl-warmup", "--mpl-default-style=nonexistent",
+                                "-p", "no:xdist")
+    result.assert_outcomes(failed=2)
+    result.stdout.fnmatch_lines(["Warm-up failed: *nonexistent*"])
+
+
+def test_warmup_marker_style(pytester):
+    """
+    The styles and backends set in the markers are also warmed up.
+    """
+    pytester.makepyfile(test_figures=TEST_FILE.replace("mpl_image_compare", "mpl_image_compare(style='missing')"))
+    result = pytester.runpytest("--mpl-generate-path=baseline", "--mpl-warmup", "-p", "no:xdist")
+    result.assert_outcomes(failed=2)
+    result.stdout.fnmatch_lines(["Warm-up failed: *missing*"])